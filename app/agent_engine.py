@@ -19,6 +19,9 @@ from app.services import chat_manager, llm_service
 
 logger = logging.getLogger(__name__)
 
+# "message": "..." inside a Gemini API error wrapped in a string repr
+ERROR_MESSAGE_PATTERN = re.compile(r'"message":\s*"(.*?)"')
+
 
 class ActionRequest(BaseModel):
     """Pydantic model for an action request payload."""
@@ -110,7 +113,7 @@ def _extract_error_message(error_text: str) -> str:
     # Try to find the inner JSON message key "message"
     # Matches "message": "..." inside the string.
     # Note: This is a heuristic for Gemini API errors wrapped in string reprs.
-    match = re.search(r'"message":\s*"(.*?)"', error_text)
+    match = ERROR_MESSAGE_PATTERN.search(error_text)
     if match:
         return match.group(1)
     return error_text
@@ -17,7 +17,7 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 from app.config import get_mcp_servers, HOST, PORT
-from app.services import rag_manager, llm_service
+from app.services import jules_api, rag_manager, llm_service
 from app.services.database import DatabaseManager
 from app.services.git_ops import CODEBASE_ROOT
 from app.services.lsp_manager import LSPManager
@@ -94,6 +94,7 @@ async def lifespan(_app: FastAPI):
                 logger.error("Failed to initialize MCP server %s: %s", name, e)
 
         yield
+        await jules_api.close_jules_session()
         logger.info("Shutting down MCP sessions...")
     # Shutdown (if needed)
 
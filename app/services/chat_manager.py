@@ -4,6 +4,8 @@ Service module for managing chat history via SQLite.
 
 import json
 import logging
+import os
+import threading
 import uuid
 import functools
 from datetime import datetime, timezone
@@ -13,6 +15,18 @@ from .database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Part keys (snake and camel case) that mark a function call / response
+_CALL_KEYS = frozenset({"function_call", "functionCall"})
+_RESP_KEYS = frozenset({"function_response", "functionResponse"})
+
+# In-process cache of the last loaded history, keyed on the query limit, the
+# manager's write generation (so back-to-back writes within the mtime
+# granularity are not missed) and the database file's (path, mtime_ns, size).
+_HISTORY_CACHE = {"key": None, "data": []}
+_HISTORY_CACHE_LOCK = threading.Lock()
+# Message count for get_history_page, cached under the same kind of key
+_COUNT_CACHE = {"key": None, "count": 0}
+
 
 @functools.lru_cache(maxsize=1024)
 def _parse_parts(parts_str: str) -> list:
@@ -46,11 +60,29 @@ def _row_to_message(row: dict) -> dict:
     return msg
 
 
+def _history_cache_key(db: DatabaseManager, limit) -> tuple | None:
+    """Builds the cache key for a history load, or None if the DB can't be stat'ed."""
+    try:
+        st = os.stat(db.db_path)
+    except OSError:
+        return None
+    return (db.db_path, limit, db.write_generation, st.st_mtime_ns, st.st_size)
+
+
 def load_chat_history(limit: int = HISTORY_LIMIT):
     """
     Loads chat history from the database, optionally limited to the most recent messages.
+    Repeated loads of an unchanged database are served from an in-process cache.
     """
     db = DatabaseManager()
+    # Commit queued messages first so the key reflects them
+    db.flush(report_errors=False)
+    key = _history_cache_key(db, limit)
+    with _HISTORY_CACHE_LOCK:
+        if key is not None and _HISTORY_CACHE["key"] == key:
+            # Return a shallow copy so callers can't mutate the cached list
+            return list(_HISTORY_CACHE["data"])
+
     if limit:
         rows = db.fetch_all(
             "SELECT * FROM messages ORDER BY created_at DESC LIMIT ?", (limit,)
@@ -65,9 +97,7 @@ def load_chat_history(limit: int = HISTORY_LIMIT):
     # Sanitization: Remove dangling function calls
     if history and history[-1].get("parts"):
         last_parts = history[-1]["parts"]
-        if any(
-            "function_call" in part or "functionCall" in part for part in last_parts
-        ):
+        if any(not _CALL_KEYS.isdisjoint(part) for part in last_parts):
             history.pop()
             logger.warning(
                 "Detected incomplete function call in history. "
@@ -77,17 +107,17 @@ def load_chat_history(limit: int = HISTORY_LIMIT):
     # Sanitization: Remove orphaned function responses at start
     if history and history[0].get("parts"):
         first_parts = history[0]["parts"]
-        if any(
-            "function_response" in part or "functionResponse" in part
-            for part in first_parts
-        ):
+        if any(not _RESP_KEYS.isdisjoint(part) for part in first_parts):
             history.pop(0)
             logger.warning(
                 "Detected orphaned function response in history. "
                 "Removed first message to prevent API error."
             )
 
-    return history
+    with _HISTORY_CACHE_LOCK:
+        _HISTORY_CACHE["key"] = key
+        _HISTORY_CACHE["data"] = history
+    return list(history)
 
 
 def add_context_marker():
@@ -97,7 +127,8 @@ def add_context_marker():
 
 def save_message(role, text, parts=None):
     """
-    Appends a message to the chat history and saves it.
+    Appends a message to the chat history.
+    The insert is queued and committed in batches by the database manager.
     """
     if parts is None:
         parts = [{"text": text}]
@@ -109,7 +140,7 @@ def save_message(role, text, parts=None):
     content = text
 
     db = DatabaseManager()
-    db.execute_query(
+    db.queue_write(
         """
         INSERT INTO messages (id, role, content, parts, created_at)
         VALUES (?, ?, ?, ?, ?)
@@ -123,10 +154,20 @@ def get_history_page(limit=20, offset=0):
     Retrieves a paginated slice of the chat history.
     """
     db = DatabaseManager()
-
-    # Get total count
-    count_row = db.fetch_one("SELECT COUNT(*) as count FROM messages")
-    total = count_row["count"] if count_row else 0
+    # Commit queued messages first so the key reflects them
+    db.flush(report_errors=False)
+
+    # Get total count, reusing the last one while the database is unchanged
+    key = _history_cache_key(db, None)
+    with _HISTORY_CACHE_LOCK:
+        hit = key is not None and _COUNT_CACHE["key"] == key
+        total = _COUNT_CACHE["count"] if hit else None
+    if total is None:
+        count_row = db.fetch_one("SELECT COUNT(*) as count FROM messages")
+        total = count_row["count"] if count_row else 0
+        with _HISTORY_CACHE_LOCK:
+            _COUNT_CACHE["key"] = key
+            _COUNT_CACHE["count"] = total
 
     # Get slice
     rows = db.fetch_all(
@@ -2,11 +2,85 @@
 Service for executing Python code in a subprocess.
 """
 
+import os
+import signal
 import subprocess
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+CODE_EXEC_TIMEOUT = 30
+# Number of python3 workers kept started ahead of time. Each worker still runs
+# exactly one snippet, so isolation is unchanged; only the interpreter startup
+# is moved off the request path.
+CODE_EXEC_WARM_WORKERS = int(os.environ.get("CODE_EXEC_WARM_WORKERS", "1"))
+
+# Runs in each worker: waits for the snippet on stdin, then runs it like
+# `python3 -c` would (as __main__, with tracebacks starting at the snippet).
+_WORKER_BOOTSTRAP = """
+import sys, traceback
+_code = sys.stdin.read()
+try:
+    exec(compile(_code, "<string>", "exec"), {"__name__": "__main__"})
+except SystemExit:
+    raise
+except BaseException as e:
+    traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    sys.exit(1)
+"""
+
+_WARM_WORKERS: list[subprocess.Popen] = []
+_WARM_WORKERS_LOCK = threading.Lock()
+
+
+def _spawn_worker() -> subprocess.Popen:
+    """Starts a python3 worker in its own process group, waiting for a snippet."""
+    return subprocess.Popen(  # pylint: disable=consider-using-with
+        ["python3", "-u", "-c", _WORKER_BOOTSTRAP],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+
+
+def _take_worker() -> subprocess.Popen:
+    """Returns a started worker and tops the warm pool back up."""
+    with _WARM_WORKERS_LOCK:
+        worker = None
+        while _WARM_WORKERS and worker is None:
+            candidate = _WARM_WORKERS.pop()
+            if candidate.poll() is None:
+                worker = candidate
+        while len(_WARM_WORKERS) < CODE_EXEC_WARM_WORKERS:
+            _WARM_WORKERS.append(_spawn_worker())
+    return worker or _spawn_worker()
+
+
+def _kill_worker(worker: subprocess.Popen):
+    """Kills a worker and anything it started, then reaps it."""
+    try:
+        os.killpg(worker.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    worker.communicate()
+
+
+def _format_response(output: str, error: str) -> str:
+    """Formats a worker's captured stdout/stderr."""
+    response = ""
+    if output:
+        response += f"Output:\n{output}\n"
+    if error:
+        response += f"Error:\n{error}\n"
+
+    if not response:
+        response = "Code executed successfully with no output."
+
+    return response.strip()
+
 
 def execute_code(code: str) -> str:
     """
@@ -20,30 +94,15 @@ def execute_code(code: str) -> str:
     """
     logger.info("Executing code...")
     try:
-        # Run the code in a subprocess
-        result = subprocess.run(
-            ["python3", "-c", code],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            check=False,
-        )
-
-        output = result.stdout
-        error = result.stderr
-
-        response = ""
-        if output:
-            response += f"Output:\n{output}\n"
-        if error:
-            response += f"Error:\n{error}\n"
-
-        if not response:
-            response = "Code executed successfully with no output."
-
-        return response.strip()
-
-    except subprocess.TimeoutExpired:
-        return "Error: Code execution timed out after 30 seconds."
+        # Run the code in a (pre-started) subprocess
+        worker = _take_worker()
+        try:
+            stdout, stderr = worker.communicate(code, timeout=CODE_EXEC_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            _kill_worker(worker)
+            return f"Error: Code execution timed out after {CODE_EXEC_TIMEOUT} seconds."
+
+        return _format_response(stdout, stderr)
+
     except Exception as e:  # pylint: disable=broad-exception-caught
         return f"Error executing code: {str(e)}"
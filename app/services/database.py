@@ -6,7 +6,10 @@ import sqlite3
 import json
 import os
 import logging
+import threading
 import uuid
+import atexit
+from itertools import groupby
 from datetime import datetime, timezone
 from contextlib import contextmanager
 from typing import List, Optional
@@ -15,14 +18,95 @@ from .storage import get_storage_path
 
 logger = logging.getLogger(__name__)
 
+# Part keys (snake and camel case) that mark a function call / response
+_CALL_KEYS = frozenset({"function_call", "functionCall"})
+_RESP_KEYS = frozenset({"function_response", "functionResponse"})
+
 DATABASE_URL = get_storage_path("DATABASE_URL", "app.db")
+# Let SQLite serve reads straight from a memory map of the database file
+# instead of copying pages through read() into its own page cache.
+MMAP_SIZE = 64 * 1024 * 1024
+# Queued writes are flushed in one transaction once this many are pending, or
+# after FLUSH_INTERVAL seconds, whichever comes first.
+FLUSH_BATCH_SIZE = 64
+FLUSH_INTERVAL = 0.05
+# Legacy JSON files are streamed in chunks of this size during migration and
+# inserted in batches of MIGRATION_BATCH_SIZE rows.
+MIGRATION_READ_CHUNK = 64 * 1024
+MIGRATION_BATCH_SIZE = 1000
+
+_JSON_DECODER = json.JSONDecoder()
+# Primary SQLite result codes worth retrying a flush for: BUSY, LOCKED, IOERR,
+# FULL and CANTOPEN. Anything else (bad SQL, constraint violations) would fail
+# the same way again.
+_TRANSIENT_SQLITE_CODES = frozenset({5, 6, 10, 13, 14})
+
+
+def _is_transient(error: sqlite3.Error) -> bool:
+    """Checks whether a failed write may succeed if retried."""
+    code = getattr(error, "sqlite_errorcode", None)
+    return code is not None and code & 0xFF in _TRANSIENT_SQLITE_CODES
+
+
+def _iter_json_array(f, chunk_size: int = MIGRATION_READ_CHUNK):
+    """
+    Yields the items of a top-level JSON array one at a time, reading the text
+    file `f` in chunks so the whole document is never held in memory.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    # Each failed decode of an item re-parses it from its start, so the read
+    # size doubles until the item fits; parsing stays linear in the item size.
+    read_size = chunk_size
+    while True:
+        # Skip whitespace and separators between items
+        while pos < len(buf) and buf[pos] in " \t\r\n,[":
+            if buf[pos] == "[":
+                if started:
+                    break
+                started = True
+            pos += 1
+
+        if pos < len(buf) and buf[pos] == "]":
+            return
+
+        if pos < len(buf):
+            try:
+                item, end = _JSON_DECODER.raw_decode(buf, pos)
+                # A value may be cut short by the chunk boundary (e.g. "1" of
+                # "1.5"), so only trust it once the following delimiter is seen
+                if eof or (end < len(buf) and buf[end] in " \t\r\n,]"):
+                    yield item
+                    pos = end
+                    read_size = chunk_size
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_size *= 2
+
+        if eof:
+            return
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
 
 
 class DatabaseManager:
     """Singleton class to manage SQLite database connections and migrations."""
 
     _instance = None
+    _write_lock = threading.Lock()
     db_path: str  # Type hint for pylint
+    write_generation: int
+    _pending: list
+    _pending_cond: threading.Condition
+    _flusher: Optional[threading.Thread]
+    _flush_error: Optional[sqlite3.Error]
 
     def __new__(cls, db_url: Optional[str] = None):
         if cls._instance is None:
@@ -31,6 +115,15 @@ class DatabaseManager:
                 cls._instance.db_path = db_url
             else:
                 cls._instance.db_path = DATABASE_URL
+            # Bumped after every committed in-process write; lets callers key
+            # caches on it without relying on the file's mtime granularity.
+            cls._instance.write_generation = 0
+            cls._instance._pending = []
+            cls._instance._pending_cond = threading.Condition()
+            cls._instance._flusher = None
+            # Error from a background flush that dropped writes, raised to the
+            # next caller that flushes
+            cls._instance._flush_error = None
         return cls._instance
 
     def __init__(self, db_url: Optional[str] = None):
@@ -44,6 +137,8 @@ class DatabaseManager:
     @classmethod
     def reset_instance(cls):
         """Resets the singleton instance. Use only for testing."""
+        if cls._instance is not None:
+            cls._instance.flush(report_errors=False)
         cls._instance = None
 
     @contextmanager
@@ -51,6 +146,7 @@ class DatabaseManager:
         """Yields a SQLite connection."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
         try:
             yield conn
             conn.commit()
@@ -87,6 +183,12 @@ class DatabaseManager:
                     created_at DATETIME
                 )
             """)
+            # History is always read newest-first by created_at; the index lets
+            # paged reads walk just the requested tail instead of sorting the table
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_messages_created_at
+                ON messages (created_at)
+            """)
 
             # Settings table
             cursor.execute("""
@@ -99,6 +201,7 @@ class DatabaseManager:
 
     def migrate_from_json(self):
         """Migrates data from legacy JSON files if tables are empty."""
+        migrated_files = []
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
@@ -110,19 +213,38 @@ class DatabaseManager:
             cursor.execute("SELECT COUNT(*) FROM messages")
             messages_count = cursor.fetchone()[0]
 
+            if tasks_count and messages_count:
+                return
+
+            # Everything is written in one explicit transaction, so the
+            # migration pays for a single durable commit instead of one per row
+            cursor.execute("BEGIN")
+
             if tasks_count == 0:
-                self._migrate_tasks(cursor)
+                migrated_files.append(self._migrate_tasks(cursor))
 
             if messages_count == 0:
-                self._migrate_chat_history(cursor)
+                migrated_files.append(self._migrate_chat_history(cursor))
+
+            conn.commit()
+
+        # Rename legacy files only once their rows are committed, so a crash
+        # before this point leaves them in place and the migration runs again
+        for path in migrated_files:
+            if path:
+                os.rename(path, path + ".bak")
 
-    def _migrate_tasks(self, cursor):
+    def _migrate_tasks(self, cursor) -> Optional[str]:
+        """Inserts legacy tasks. Returns the file to retire once committed."""
         tasks_file = get_storage_path("JULES_TASKS_FILE", "tasks.json")
-        if not os.path.exists(tasks_file):
-            return
+        try:
+            # pylint: disable-next=consider-using-with
+            f = open(tasks_file, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
 
         try:
-            with open(tasks_file, "r", encoding="utf-8") as f:
+            with f:
                 tasks = json.load(f)
 
             logger.info("Migrating %d tasks from %s...", len(tasks), tasks_file)
@@ -168,87 +290,226 @@ class DatabaseManager:
                     task_data,
                 )
 
-            # Rename legacy file
-            os.rename(tasks_file, tasks_file + ".bak")
             logger.info("Tasks migration complete.")
+            return tasks_file
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error migrating tasks: %s", e)
+            return None
 
-    def _migrate_chat_history(self, cursor):
+    def _migrate_chat_history(self, cursor) -> Optional[str]:
+        """Inserts legacy chat messages. Returns the file to retire once committed."""
         chat_file = get_storage_path("CHAT_HISTORY_FILE", "chat_history.json")
-        if not os.path.exists(chat_file):
-            return
-
         try:
-            with open(chat_file, "r", encoding="utf-8") as f:
-                history = json.load(f)
-
-            logger.info("Migrating %d messages from %s...", len(history), chat_file)
-
-            # Reuse sanitization logic from chat_manager (simplified here as we iterate)
-            # Remove dangling function calls at the end
-            if history and history[-1].get("parts"):
-                last_parts = history[-1]["parts"]
-                if any(
-                    "function_call" in part or "functionCall" in part
-                    for part in last_parts
-                ):
-                    history.pop()
-                    logger.warning("Removed incomplete function call during migration.")
+            # pylint: disable-next=consider-using-with
+            f = open(chat_file, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        insert_query = """
+            INSERT INTO messages (id, role, content, parts, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """
 
-            # Remove orphaned function responses at start
-            if history and history[0].get("parts"):
-                first_parts = history[0]["parts"]
-                if any(
-                    "function_response" in part or "functionResponse" in part
-                    for part in first_parts
+        def to_row(msg):
+            msg_id = msg.get("id", str(uuid.uuid4()))
+            parts = msg.get("parts", [])
+            # Extract content (text) from parts for easier querying if available
+            content = "".join(part["text"] for part in parts if "text" in part)
+            created_at = datetime.now(timezone.utc).isoformat()
+            return (msg_id, msg.get("role"), content, json.dumps(parts), created_at)
+
+        # Messages are inserted while the file is still being read, so undo a
+        # partial import if the file turns out to be malformed
+        cursor.execute("SAVEPOINT chat_migration")
+        try:
+            logger.info("Migrating messages from %s...", chat_file)
+            migrated = 0
+            batch = []
+            with f:
+                messages = _iter_json_array(f)
+
+                # Reuse sanitization logic from chat_manager (simplified here as we iterate)
+                # Remove orphaned function responses at start
+                pending = next(messages, None)
+                if pending and any(
+                    not _RESP_KEYS.isdisjoint(part)
+                    for part in pending.get("parts") or []
                 ):
-                    history.pop(0)
                     logger.warning(
                         "Removed orphaned function response during migration."
                     )
+                    pending = next(messages, None)
+
+                # Each message is written once the next one is seen, so the last
+                # one can still be dropped below
+                for msg in messages:
+                    batch.append(to_row(pending))
+                    pending = msg
+                    if len(batch) >= MIGRATION_BATCH_SIZE:
+                        cursor.executemany(insert_query, batch)
+                        migrated += len(batch)
+                        batch.clear()
 
-            message_data = []
-            for msg in history:
-                msg_id = msg.get("id", str(uuid.uuid4()))
-                role = msg.get("role")
-                parts = msg.get("parts", [])
-
-                # Extract content (text) from parts for easier querying if available
-                content = "".join(part["text"] for part in parts if "text" in part)
-
-                created_at = datetime.now(timezone.utc).isoformat()
-
-                message_data.append(
-                    (msg_id, role, content, json.dumps(parts), created_at)
-                )
+            # Remove dangling function calls at the end
+            if pending is not None:
+                if any(
+                    not _CALL_KEYS.isdisjoint(part)
+                    for part in pending.get("parts") or []
+                ):
+                    logger.warning("Removed incomplete function call during migration.")
+                else:
+                    batch.append(to_row(pending))
 
-            if message_data:
-                cursor.executemany(
-                    """
-                    INSERT INTO messages (id, role, content, parts, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """,
-                    message_data,
-                )
+            if batch:
+                cursor.executemany(insert_query, batch)
+                migrated += len(batch)
+            logger.info("Migrated %d messages.", migrated)
 
-            # Rename legacy file
-            os.rename(chat_file, chat_file + ".bak")
+            cursor.execute("RELEASE chat_migration")
             logger.info("Chat history migration complete.")
+            return chat_file
 
         except Exception as e:  # pylint: disable=broad-exception-caught
+            cursor.execute("ROLLBACK TO chat_migration")
             logger.error("Error migrating chat history: %s", e)
+            return None
 
     def execute_query(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
-        """Executes a query and returns the cursor."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        """Executes a query and returns the cursor.
+
+        Writes are serialized on an in-process lock so concurrent worker threads
+        queue up here instead of contending on SQLite's file lock (which backs off
+        with sleeps when busy). Other processes sharing the file still rely on
+        SQLite's own locking. Queued writes are flushed first to keep ordering.
+        """
+        with self._write_lock:
+            self._flush_pending()
+            self._raise_flush_error()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+            self.write_generation += 1
             return cursor
 
+    def queue_write(self, query: str, params: tuple = ()):
+        """Queues a write to be committed by a background flusher.
+
+        Rapid successive writes (e.g. messages saved while streaming) are
+        coalesced into a single transaction instead of paying a connection,
+        commit and fsync each. Reads and synchronous writes through this manager
+        flush the queue first, so callers in this process always see their writes.
+        """
+        with self._pending_cond:
+            self._pending.append((query, params))
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            elif len(self._pending) >= FLUSH_BATCH_SIZE:
+                self._pending_cond.notify()
+
+    def _flush_loop(self):
+        """Waits for a full batch or the flush interval, then flushes and exits."""
+        with self._pending_cond:
+            self._pending_cond.wait_for(
+                lambda: len(self._pending) >= FLUSH_BATCH_SIZE, timeout=FLUSH_INTERVAL
+            )
+            self._flusher = None
+        self.flush(report_errors=False)
+
+    def flush(self, report_errors: bool = True) -> int:
+        """Commits all queued writes. Returns the number of statements written.
+
+        With report_errors (for write callers), raises the sqlite3.Error of a
+        failed flush, including one left over from an earlier flush that wasn't
+        reported. Reads pass False: they still flush, but never fail because of
+        someone else's write; non-transient errors are kept for the next writer.
+        """
+        with self._write_lock:
+            try:
+                written = self._flush_pending()
+            except sqlite3.Error as e:
+                if report_errors:
+                    raise
+                # Transient failures stay queued and are retried by the next flush
+                if not _is_transient(e):
+                    self._flush_error = e
+                return 0
+            if report_errors:
+                self._raise_flush_error()
+            return written
+
+    def _raise_flush_error(self):
+        """Raises an unreported flush error, once. Caller holds the write lock."""
+        error, self._flush_error = self._flush_error, None
+        if error is not None:
+            raise error
+
+    def _flush_pending(self) -> int:
+        """Commits queued writes in one transaction. Caller holds the write lock.
+
+        On a transient error (database locked, I/O) the writes are put back at
+        the front of the queue and retried by the next flush. On any other error
+        the batch is replayed one statement at a time, so only the failing
+        writes are dropped. Either way the error is raised, so writes are never
+        lost silently.
+        """
+        with self._pending_cond:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # Consecutive writes of the same statement go through one
+                # executemany
+                for query, group in groupby(batch, key=lambda item: item[0]):
+                    cursor.executemany(query, [params for _, params in group])
+            self.write_generation += 1
+        except sqlite3.Error as e:
+            if _is_transient(e):
+                logger.error(
+                    "Failed to flush %d queued writes, will retry: %s", len(batch), e
+                )
+                with self._pending_cond:
+                    self._pending[:0] = batch
+                raise
+            logger.error(
+                "Failed to flush %d queued writes, replaying one by one: %s",
+                len(batch),
+                e,
+            )
+            self._replay_writes(batch)
+        return len(batch)
+
+    def _replay_writes(self, batch: list):
+        """Writes queued statements one at a time, skipping the ones that fail.
+
+        Raises the first failure once the rest are written. Caller holds the
+        write lock.
+        """
+        first_error = None
+        with self.get_connection() as conn:
+            for i, (query, params) in enumerate(batch):
+                try:
+                    conn.execute(query, params)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    if _is_transient(e):
+                        with self._pending_cond:
+                            self._pending[:0] = batch[i:]
+                        raise
+                    logger.error("Dropped queued write %r: %s", query, e)
+                    first_error = first_error or e
+        self.write_generation += 1
+        if first_error is not None:
+            raise first_error
+
     def fetch_one(self, query: str, params: tuple = ()) -> Optional[dict]:
         """Executes a query and returns one row as a dict."""
+        self.flush(report_errors=False)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
@@ -257,8 +518,19 @@ class DatabaseManager:
 
     def fetch_all(self, query: str, params: tuple = ()) -> List[dict]:
         """Executes a query and returns all rows as a list of dicts."""
+        self.flush(report_errors=False)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
+
+
+@atexit.register
+def _flush_on_exit():
+    """Commits any writes still queued when the interpreter shuts down."""
+    if DatabaseManager._instance is not None:  # pylint: disable=protected-access
+        try:
+            DatabaseManager._instance.flush()  # pylint: disable=protected-access
+        except sqlite3.Error:
+            pass  # Already logged by the flush
@@ -8,10 +8,17 @@ import os
 import re
 import subprocess
 import logging
+import mmap
+import time
 import ast
+import io
+import itertools
+import tempfile
 import xml.etree.ElementTree as ET
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 import pathspec
+from pathspec.util import normalize_file
 from app import config
 from app.services import prompt_router
 
@@ -24,17 +31,55 @@ KOTLIN_OUTLINE_PATTERN = re.compile(
     r"^\s*((@\w+\s*)*\s*(fun|class|data class|interface|object)\s+[\w<>]+)",
     re.MULTILINE,
 )
+# [^\S\n] is whitespace other than newline, so a match never spans lines
 JS_OUTLINE_PATTERN = re.compile(
-    r"^\s*(export\s+)?(default\s+)?(async\s+)?"
-    r"(function|class|const|let|var|interface|type|enum)\s+([\w$]+)",
+    r"^[^\S\n]*(export[^\S\n]+)?(default[^\S\n]+)?(async[^\S\n]+)?"
+    r"(function|class|const|let|var|interface|type|enum)[^\S\n]+([\w$]+)",
+    re.MULTILINE,
+)
+# Fallback outline for Python files ast can't parse: top-level def/class, a
+# one-level (4-space) method def, or any other statement at column 0 (which
+# ends the current class body)
+PYTHON_OUTLINE_PATTERN = re.compile(
+    r"^(?:(?P<method> {4})(?:async[ \t]+)?def[ \t]+(?P<method_name>\w+)"
+    r"|(?:async[ \t]+)?(?P<kind>def|class)[ \t]+(?P<name>\w+)"
+    r"|[^\s#])",
     re.MULTILINE,
 )
 WHITESPACE_PATTERN = re.compile(r"\s+")
+GITHUB_REPO_PATTERN = re.compile(r"github\.com[:/]([\w.-]+)/([\w.-]+)")
+
+# argv for the read-only git probes, built once
+_GIT_REMOTE_URL_ARGV = ("git", "remote", "get-url", "origin")
+_GIT_BRANCH_ARGV = ("git", "rev-parse", "--abbrev-ref", "HEAD")
 
 # Default to /codebase inside Docker, but fallback to current directory for local testing
 CODEBASE_ROOT = os.environ.get("CODEBASE_ROOT", "/codebase")
 MAX_FILES_LIMIT = 500
 MAX_READ_LINES = 2000
+# Files larger than this are memory-mapped by read_file, so only the requested
+# line range is decoded instead of the whole file.
+MMAP_READ_THRESHOLD = 1 << 20
+# Seconds a cached `git ls-files` listing is reused while .git/index is
+# unchanged. Bounds how long untracked files created outside this process
+# (which don't touch the index) can be missing from list_files.
+FILE_LIST_TTL = 10.0
+# grep_code returns at most this many characters of output. Each match line is
+# at least one character, so it is also passed to grep as the per-file match cap.
+GREP_OUTPUT_LIMIT = 2000
+# Threads list_files uses to scan directories when git can't list the files.
+# scandir releases the GIL, so sibling subtrees are read concurrently, which
+# mostly pays off on cold caches and network filesystems.
+WALK_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+# Seconds a git log result is reused while HEAD is unchanged. Bounded because
+# the output contains relative dates ("2 hours ago"); minutes of drift are fine.
+GIT_LOG_CACHE_TTL = 180.0
+GIT_LOG_CACHE_SIZE = 128
+# Seconds a get_repo_info result is reused before git is consulted again
+REPO_INFO_TTL = 30.0
+# Directories that are always ignored. list_files prunes these by name before
+# running the (comparatively slow) pathspec match.
+DEFAULT_IGNORE_DIRS = frozenset({".git", "__pycache__", "node_modules", "venv", ".env"})
 
 
 def _writes_allowed() -> bool:
@@ -49,6 +94,18 @@ def _writes_allowed() -> bool:
     )
 
 
+# CODEBASE_ROOT -> its realpath; resolved once instead of on every path check
+_ROOT_REALPATHS: dict[str, str] = {}
+
+
+def _root_realpath() -> str:
+    """Returns the realpath of CODEBASE_ROOT."""
+    root_real = _ROOT_REALPATHS.get(CODEBASE_ROOT)
+    if root_real is None:
+        root_real = _ROOT_REALPATHS[CODEBASE_ROOT] = os.path.realpath(CODEBASE_ROOT)
+    return root_real
+
+
 def _validate_path(path: str) -> str:
     """
     Validates that a path is within the codebase root.
@@ -61,57 +118,129 @@ def _validate_path(path: str) -> str:
     # Resolve absolute path
     full_path = os.path.abspath(os.path.join(CODEBASE_ROOT, path))
 
-    # Security check: Ensure we are still inside CODEBASE_ROOT using commonpath
-    # We use realpath to resolve symlinks and prevent traversal
-    try:
-        full_path_real = os.path.realpath(full_path)
-        root_real = os.path.realpath(CODEBASE_ROOT)
-        if os.path.commonpath([full_path_real, root_real]) != root_real:
-            raise ValueError(
-                f"Access denied. Cannot access path outside of codebase: {path}"
-            )
-    except ValueError as e:
-        # Can happen on different drives on Windows, essentially outside
+    # Security check: Ensure we are still inside CODEBASE_ROOT. realpath
+    # resolves symlinks to prevent traversal; a prefix comparison against the
+    # resolved root (plus separator, so "/codebase2" doesn't pass) suffices.
+    root_real = _root_realpath()
+    full_path_real = os.path.realpath(full_path)
+    if full_path_real != root_real and not full_path_real.startswith(
+        root_real.rstrip(os.sep) + os.sep
+    ):
         raise ValueError(
             f"Access denied. Cannot access path outside of codebase: {path}"
-        ) from e
+        )
 
     return full_path
 
 
-@lru_cache(maxsize=1)
+# path -> ((st_mtime_ns, st_size), parsed result) for small repo files
+# (.gitignore, .git/config) that are read far more often than they change
+_FILE_PARSE_CACHE: dict[str, tuple[tuple[int, int] | None, object]] = {}
+
+
+def clear_file_parse_cache():
+    """Drops the cached .gitignore and .git/config parses."""
+    _FILE_PARSE_CACHE.clear()
+
+
+def _cached_file_parse(path: str, parse_fn):
+    """
+    Returns parse_fn(f) for the file at path opened in binary mode, reusing the previous
+    result while the file's (mtime, size) is unchanged. A missing file parses
+    as empty. Other OSErrors are raised to the caller.
+    """
+    try:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = None
+    cached = _FILE_PARSE_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    if key is None:
+        result = parse_fn(io.BytesIO())
+    else:
+        with open(path, "rb") as f:
+            result = parse_fn(f)
+    _FILE_PARSE_CACHE[path] = (key, result)
+    return result
+
+
+def _config_value(value: bytes) -> bytes:
+    """Strips a git config value of surrounding quotes or a trailing comment."""
+    if value.startswith(b'"'):
+        closing = value.find(b'"', 1)
+        return value[1:closing] if closing != -1 else value[1:]
+    for comment in (b"#", b";"):
+        value = value.split(comment, 1)[0]
+    return value.strip()
+
+
+def _is_origin_section(header: bytes) -> bool:
+    """
+    Returns True for a [remote "origin"] section header. Like git, the section
+    name is case-insensitive and the deprecated [remote.origin] form is accepted.
+    """
+    name = header[1:].partition(b"]")[0].strip()
+    section, _, subsection = name.partition(b" ")
+    if subsection:
+        return section.lower() == b"remote" and subsection.strip() == b'"origin"'
+    return name.lower() == b"remote.origin"
+
+
+def _parse_origin_url(f) -> str:
+    """Returns the [remote "origin"] url from a git config file, or ""."""
+    # A single line scan: git config is line-oriented, and only one key of one
+    # section is needed (configparser would also need options for the repeated
+    # and bare keys git allows). Lines stay bytes; only the URL is decoded.
+    in_origin = False
+    for raw_line in f:
+        line = raw_line.strip()
+        if not line or line[:1] in (b"#", b";"):
+            continue
+        if line[:1] == b"[":
+            in_origin = _is_origin_section(line)
+            continue
+        if in_origin:
+            key, sep, value = line.partition(b"=")
+            if sep and key.strip().lower() == b"url":
+                return _config_value(value.strip()).decode("utf-8", "replace")
+    return ""
+
+
+def _config_remote_url() -> str:
+    """Returns the origin URL from the git config file, or "" if it isn't set there."""
+    # Worktrees share the main repository's config, so they don't need git either
+    git_config_path = os.path.join(_git_common_dir(), "config")
+    try:
+        return _cached_file_parse(git_config_path, _parse_origin_url)
+    except OSError as e:
+        logger.warning("Failed to parse git config: %s", e)
+        return ""
+
+
+def _run_git(argv: tuple[str, ...]) -> bytes:
+    """
+    Runs a read-only git command in CODEBASE_ROOT and returns its stdout.
+    Raises CalledProcessError or FileNotFoundError like check_output.
+    """
+    # Python creates fds non-inheritable (PEP 446), so there's nothing to
+    # close in the child and the pass over its fd table can be skipped
+    return subprocess.check_output(
+        argv, cwd=CODEBASE_ROOT, stderr=subprocess.DEVNULL, close_fds=False
+    )
+
+
 def _get_remote_url():
     """Attempts to retrieve the git remote origin URL."""
-    remote_url = ""
-
     # 1. Try .git/config (Much faster than subprocess)
-    git_config_path = os.path.join(CODEBASE_ROOT, ".git", "config")
-    if os.path.exists(git_config_path):
-        try:
-            with open(git_config_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            remote_block_match = re.search(
-                r'\[remote "origin"\](.*?)(?=\[|$)', content, re.DOTALL
-            )
-            if remote_block_match:
-                block_content = remote_block_match.group(1)
-                # Handle quoted and unquoted URLs
-                url_match = re.search(r'url\s*=\s*(?:"([^"]+)"|(\S+))', block_content)
-                if url_match:
-                    # Group 1 is quoted content, Group 2 is unquoted content
-                    remote_url = url_match.group(1) or url_match.group(2)
-        except OSError as e:
-            logger.warning("Failed to parse git config: %s", e)
+    remote_url = _config_remote_url()
 
     # 2. Fallback to git remote get-url origin
     if not remote_url:
         try:
-            remote_url_bytes = subprocess.check_output(
-                ["git", "remote", "get-url", "origin"],
-                cwd=CODEBASE_ROOT,
-                stderr=subprocess.DEVNULL,
-            )
-            remote_url = remote_url_bytes.decode("utf-8").strip()
+            remote_url = _run_git(_GIT_REMOTE_URL_ARGV).decode("utf-8").strip()
         except subprocess.CalledProcessError as e:
             logger.debug("git remote get-url origin failed: %s", e)
         except FileNotFoundError:
@@ -120,16 +249,60 @@ def _get_remote_url():
     return remote_url
 
 
+def _git_dir() -> str:
+    """
+    Returns the repository's git directory. In a linked worktree or submodule
+    .git is a file holding "gitdir: <path>" instead of the directory itself.
+    """
+    dot_git = os.path.join(CODEBASE_ROOT, ".git")
+    try:
+        with open(dot_git, "r", encoding="utf-8") as f:
+            line = f.readline().strip()
+    except OSError:
+        # Usually IsADirectoryError: a regular checkout
+        return dot_git
+    if line.startswith("gitdir:"):
+        return os.path.join(CODEBASE_ROOT, line[len("gitdir:") :].strip())
+    return dot_git
+
+
+def _git_common_dir(git_dir: str | None = None) -> str:
+    """
+    Returns the directory holding the repository's shared config and refs. For
+    a linked worktree that is the main repository's git directory, named by the
+    worktree's "commondir" file; otherwise it is the git directory itself.
+    """
+    git_dir = git_dir or _git_dir()
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.join(git_dir, f.readline().strip())
+    except OSError:
+        return git_dir
+
+
+def _read_head_branch() -> str | None:
+    """Reads the checked-out branch from HEAD, or None if it can't be determined."""
+    try:
+        with open(os.path.join(_git_dir(), "HEAD"), "r", encoding="utf-8") as f:
+            head = f.readline().strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/") :]
+    # Detached HEAD (a bare sha); matches `git rev-parse --abbrev-ref HEAD`
+    return "HEAD" if head else None
+
+
 def get_current_branch():
     """Attempts to retrieve the current git branch."""
+    # Reading .git/HEAD avoids forking git for the common case
+    branch = _read_head_branch()
+    if branch:
+        return branch
+
     branch = "main"  # Default
     try:
-        branch_bytes = subprocess.check_output(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=CODEBASE_ROOT,
-            stderr=subprocess.DEVNULL,
-        )
-        branch = branch_bytes.decode("utf-8").strip()
+        branch = _run_git(_GIT_BRANCH_ARGV).decode("utf-8").strip()
     except subprocess.CalledProcessError as e:
         logger.debug("git rev-parse HEAD failed: %s", e)
     except FileNotFoundError:
@@ -137,6 +310,32 @@ def get_current_branch():
     return branch
 
 
+def _start_git(argv: tuple[str, ...]) -> subprocess.Popen | None:
+    """Starts a read-only git command without waiting; collect it with _git_output."""
+    try:
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            argv,
+            cwd=CODEBASE_ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+        )
+    except FileNotFoundError:
+        logger.debug("git command not found while running %s", " ".join(argv))
+        return None
+
+
+def _git_output(proc: subprocess.Popen | None) -> str:
+    """Waits for a process from _start_git and returns its stdout, or "" on failure."""
+    if proc is None:
+        return ""
+    stdout, _ = proc.communicate()
+    if proc.returncode != 0:
+        logger.debug("%s failed with exit code %s", proc.args, proc.returncode)
+        return ""
+    return stdout.decode("utf-8").strip()
+
+
 def get_local_diff() -> str:
     """
     Retrieves the diff of all local changes (unstaged and staged).
@@ -159,13 +358,62 @@ def get_local_diff() -> str:
         return ""
 
 
+# Plain dict memo rather than lru_cache: these are hit on every UI poll and
+# take no arguments, so there is nothing for lru_cache to hash
+_REPO_INFO_CACHE = {"time": 0.0, "info": None}
+
+
+def clear_repo_info_cache():
+    """Drops the cached repository info, e.g. after a pull or branch change."""
+    _REPO_INFO_CACHE["info"] = None
+
+
 def get_repo_info():
     """
     Retrieves Git repository information including project name, branch, and Source ID.
+    Results are cached for REPO_INFO_TTL seconds so repeated UI polls don't hit git.
     """
+    now = time.monotonic()
+    info = _REPO_INFO_CACHE["info"]
+    if info is None or now - _REPO_INFO_CACHE["time"] >= REPO_INFO_TTL:
+        info = _compute_repo_info()
+        _REPO_INFO_CACHE["info"] = info
+        _REPO_INFO_CACHE["time"] = now
+    # Return a copy so callers can't mutate the cached dict
+    return dict(info)
+
+
+def _in_git_repo() -> bool:
+    """
+    Returns True if CODEBASE_ROOT or one of its parents has a .git entry, i.e.
+    whether git would find a repository from there.
+    """
+    path = os.path.abspath(CODEBASE_ROOT)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return True
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False
+        path = parent
+
+
+def _compute_repo_info():
+    """Builds the repository info returned by get_repo_info."""
+    if not _in_git_repo():
+        # What the git probes below would end up with, without forking them.
+        # "Unknown" is kept as the project since RAG indexes are keyed on it.
+        return {"project": "Unknown", "branch": "main", "source_id": ""}
+
     try:
-        remote_url = _get_remote_url()
-        branch = get_current_branch()
+        # Read both from .git first; whichever isn't there falls back to git,
+        # with the two probes started together so their startup overlaps
+        remote_url = _config_remote_url()
+        branch = _read_head_branch()
+        remote_proc = None if remote_url else _start_git(_GIT_REMOTE_URL_ARGV)
+        branch_proc = None if branch else _start_git(_GIT_BRANCH_ARGV)
+        remote_url = remote_url or _git_output(remote_proc)
+        branch = branch or _git_output(branch_proc) or "main"
 
         project = "Unknown"
         source_id = ""
@@ -176,7 +424,7 @@ def get_repo_info():
 
             # Parse user/repo from github url
             # Supports https://github.com/user/repo and git@github.com:user/repo
-            match = re.search(r"github\.com[:/]([\w.-]+)/([\w.-]+)", remote_url)
+            match = GITHUB_REPO_PATTERN.search(remote_url)
             if match:
                 user = match.group(1)
                 repo = match.group(2)
@@ -385,6 +633,9 @@ def perform_git_push(
     except (subprocess.SubprocessError, OSError) as e:
         logger.error("Git push sequence failed: %s", e)
         return {"success": False, "output": str(e)}
+    finally:
+        # The sequence may have renamed or checked out branches, even if it failed
+        clear_repo_info_cache()
 
 
 def perform_git_pull():
@@ -401,6 +652,7 @@ def perform_git_pull():
             check=True,
         )
         logger.debug("Git stdout: %s", result.stdout)
+        clear_repo_info_cache()
         return {"success": True, "output": result.stdout}
     except subprocess.CalledProcessError as e:
         logger.error("Git stderr: %s", e.stderr)
@@ -410,77 +662,415 @@ def perform_git_pull():
         return {"success": False, "output": str(e)}
 
 
-@lru_cache(maxsize=1)
-def load_gitignore_spec() -> pathspec.PathSpec:
-    """Loads .gitignore patterns and returns a PathSpec."""
+# Named groups (e.g. pathspec's "ps_d") can't repeat in a combined regex
+_NAMED_GROUP_PATTERN = re.compile(r"\(\?P<\w+>")
+
+
+def _literal_ignore_name(pattern: str) -> tuple[str, bool] | None:
+    """
+    Returns (name, dir_only) for a pattern that is just a bare name, like "venv/"
+    or ".env", which matches any path component with that name. None otherwise.
+    """
+    text = pattern.rstrip()
+    dir_only = text.endswith("/")
+    name = text[:-1] if dir_only else text
+    if not name or name in (".", "..") or name != name.lstrip():
+        return None
+    if any(c in name for c in "*?[\\/"):
+        return None
+    return name, dir_only
+
+
+def _anchored_first_dir(pattern: str) -> str | None:
+    """
+    Returns the literal first path component of a root-anchored pattern, like
+    "docs" for "docs/**/*.md" or "/docs/", which only paths under (or equal to)
+    that component can match. None for unanchored or wildcard-led patterns.
+    """
+    text = pattern.rstrip()
+    if text.startswith("/"):
+        body = text[1:]
+    elif "/" in text.rstrip("/"):
+        # A slash anywhere but the end anchors the pattern to the root
+        body = text
+    else:
+        return None
+    first = body.partition("/")[0]
+    if not first or first in (".", "..") or first != first.lstrip():
+        return None
+    if any(c in first for c in "*?[\\"):
+        return None
+    return first
+
+
+class GitignoreMatcher:
+    """
+    Matches paths against gitignore patterns. When no pattern negates ("!..."),
+    bare-name patterns (e.g. "node_modules/", ".env") are checked with set
+    lookups per path component. Anchored patterns with a literal first directory
+    (e.g. "/build/", "docs/*.md") are bucketed by that directory, and only the
+    path's own bucket is tried. The remaining patterns are folded into one
+    compiled alternation, so a path costs at most two regex matches.
+    Otherwise the PathSpec (where the last matching pattern wins) is used as-is.
+    """
+
+    def __init__(self, spec: pathspec.PathSpec):
+        self.spec = spec
+        active = [p for p in spec.patterns if p.include is not None]
+        self._fast = all(p.include for p in active)
+        self._literal_dirs = set()
+        self._literal_names = set()
+        self._regex = None
+        self._dir_regexes = {}
+        # Directory names that are ignored wherever they appear, so walkers
+        # can prune them by name before calling match_file
+        self.ignored_dir_names = DEFAULT_IGNORE_DIRS
+        if not self._fast:
+            return
+
+        wildcard = []
+        by_first_dir = {}
+        for p in active:
+            literal = _literal_ignore_name(p.pattern)
+            if literal is not None:
+                if literal[1]:
+                    self._literal_dirs.add(literal[0])
+                else:
+                    self._literal_names.add(literal[0])
+                continue
+            first_dir = _anchored_first_dir(p.pattern)
+            if first_dir is None:
+                wildcard.append(p)
+            else:
+                by_first_dir.setdefault(first_dir, []).append(p)
+        if wildcard:
+            self._regex = self._combine(wildcard)
+        self._dir_regexes = {
+            first_dir: self._combine(patterns)
+            for first_dir, patterns in by_first_dir.items()
+        }
+        self.ignored_dir_names = DEFAULT_IGNORE_DIRS.union(
+            self._literal_dirs, self._literal_names
+        )
+
+    @staticmethod
+    def _combine(patterns) -> re.Pattern:
+        """Compiles the patterns' regexes into one alternation."""
+        return re.compile(
+            "|".join(
+                f"(?:{_NAMED_GROUP_PATTERN.sub('(?:', p.regex.pattern)})"
+                for p in patterns
+            )
+        )
+
+    def match_file(self, path: str) -> bool:
+        """Returns True if the path is ignored. Directories end with "/"."""
+        if not self._fast:
+            return self.spec.match_file(path)
+
+        norm_path = normalize_file(path)
+        parts = norm_path.split("/")
+        dirs = parts[:-1]
+        if not self._literal_dirs.isdisjoint(dirs):
+            return True
+        if parts[-1] in self._literal_names or not self._literal_names.isdisjoint(dirs):
+            return True
+        if self._regex is not None and self._regex.match(norm_path) is not None:
+            return True
+        dir_regex = self._dir_regexes.get(parts[0])
+        return dir_regex is not None and dir_regex.match(norm_path) is not None
+
+
+def _parse_gitignore(f) -> GitignoreMatcher:
+    """Builds a matcher from the default ignores plus the .gitignore lines in f."""
     ignore_patterns = [".git/", "__pycache__/", "node_modules/", "venv/", ".env"]
+    # One decode of the whole file instead of a text-mode decode per line
+    ignore_patterns.extend(f.read().decode("utf-8", "replace").splitlines())
+    return GitignoreMatcher(
+        pathspec.PathSpec.from_lines("gitwildmatch", ignore_patterns)
+    )
+
+
+def load_gitignore_spec() -> GitignoreMatcher:
+    """
+    Loads .gitignore patterns and returns a matcher. The parse is reused until
+    .gitignore changes on disk.
+    """
     gitignore_path = os.path.join(CODEBASE_ROOT, ".gitignore")
-    if os.path.exists(gitignore_path):
-        try:
-            with open(gitignore_path, "r", encoding="utf-8") as f:
-                ignore_patterns.extend(f.readlines())
-        except OSError as e:
-            logger.warning("Failed to read .gitignore: %s", e)
-    return pathspec.PathSpec.from_lines("gitwildmatch", ignore_patterns)
+    try:
+        return _cached_file_parse(gitignore_path, _parse_gitignore)
+    except OSError as e:
+        logger.warning("Failed to read .gitignore: %s", e)
+        return _parse_gitignore(io.BytesIO())
 
 
-def list_files(directory: str = ".") -> list[str]:
+_FILE_LIST_CACHE = {"key": None, "time": 0.0, "files": []}
+
+
+def clear_file_list_cache():
+    """Drops the cached git file listing, e.g. after writing a file."""
+    _FILE_LIST_CACHE["key"] = None
+
+
+def _git_ls_files(*args: str) -> list[str]:
+    """Runs `git ls-files -z` with the given args and returns the paths."""
+    output = _run_git(("git", "ls-files", "-z", *args))
+    return [path for path in output.decode("utf-8", "replace").split("\0") if path]
+
+
+def _git_file_list() -> list[str] | None:
+    """
+    Returns all non-ignored files in the repository according to `git ls-files`,
+    cached on the git index stat and the .gitignore matcher. Returns None if
+    the codebase is not a git repo.
+    """
+    try:
+        st = os.stat(os.path.join(_git_dir(), "index"))
+    except OSError:
+        return None
+
+    # load_gitignore_spec returns the same matcher until .gitignore changes on
+    # disk, so an edited .gitignore takes effect on the next listing
+    spec = load_gitignore_spec()
+    key = (CODEBASE_ROOT, st.st_mtime_ns, st.st_size, spec)
+    now = time.monotonic()
+    if (
+        _FILE_LIST_CACHE["key"] == key
+        and now - _FILE_LIST_CACHE["time"] < FILE_LIST_TTL
+    ):
+        return _FILE_LIST_CACHE["files"]
+
+    try:
+        listed = _git_ls_files("--cached", "--others", "--exclude-standard")
+        # --cached still lists tracked files that were deleted from the work tree
+        deleted = set(_git_ls_files("--deleted"))
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.debug("git ls-files failed, falling back to a directory walk: %s", e)
+        return None
+
+    # Apply the same ignores as the directory walk, once per refresh. Like the
+    # walk, each directory is matched once and everything below an ignored
+    # directory is dropped without matching the individual files.
+    ignored_dirs = {"": False}
+
+    def is_dir_ignored(rel_dir: str) -> bool:
+        ignored = ignored_dirs.get(rel_dir)
+        if ignored is None:
+            parent, _, name = rel_dir.rpartition("/")
+            ignored = (
+                is_dir_ignored(parent)
+                or name in spec.ignored_dir_names
+                or spec.match_file(rel_dir + "/")
+            )
+            ignored_dirs[rel_dir] = ignored
+        return ignored
+
+    files = [
+        path
+        for path in listed
+        if path not in deleted
+        and not is_dir_ignored(path.rpartition("/")[0])
+        and not spec.match_file(path)
+    ]
+
+    _FILE_LIST_CACHE.update(key=key, time=now, files=files)
+    return files
+
+
+_WALK_POOL: dict[str, ThreadPoolExecutor] = {}
+
+
+def _walk_pool() -> ThreadPoolExecutor:
+    """Returns the thread pool that scans directories for _walk_files."""
+    pool = _WALK_POOL.get("pool")
+    if pool is None:
+        pool = _WALK_POOL.setdefault(
+            "pool",
+            ThreadPoolExecutor(max_workers=WALK_WORKERS, thread_name_prefix="walk"),
+        )
+    return pool
+
+
+def _scan_dir(
+    path: str, rel_root: str, spec: GitignoreMatcher
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    Scans one directory. Returns its non-ignored files (relative to the codebase
+    root) and its non-ignored subdirectories as (absolute dir, relative prefix).
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                # No os.path.join/relpath per entry
+                rel_path = rel_root + entry.name
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not followed
+                    if (
+                        entry.name not in spec.ignored_dir_names
+                        and not entry.is_symlink()
+                        # Append slash to ensure it matches directory-only patterns like "dir/"
+                        and not spec.match_file(rel_path + "/")
+                    ):
+                        subdirs.append((entry.path, rel_path + "/"))
+                elif not spec.match_file(rel_path):
+                    files.append(rel_path)
+    except OSError as e:
+        logger.warning("Failed to scan %s: %s", path, e)
+    return files, subdirs
+
+
+def _walk_files(base_path: str, rel_base: str, spec: GitignoreMatcher):
+    """
+    Yields non-ignored file paths under `base_path`, relative to the codebase root.
+    `rel_base` is the relative path of `base_path` itself ("" or ending in "/").
+    Files in a directory are yielded before descending into its subdirectories.
+    """
+    pool = _walk_pool()
+    # Stack of pending directory scans, consumed depth-first. Subdirectories are
+    # submitted as soon as their parent is scanned, so sibling subtrees are read
+    # concurrently while the caller consumes files in a stable order.
+    stack = [pool.submit(_scan_dir, base_path, rel_base, spec)]
+    try:
+        while stack:
+            files, subdirs = stack.pop().result()
+            # Reversed so subdirectories are visited in scandir order
+            stack.extend(
+                pool.submit(_scan_dir, path, rel_path, spec)
+                for path, rel_path in reversed(subdirs)
+            )
+            yield from files
+    finally:
+        # The caller stopped early (e.g. a page was filled); drop queued scans
+        for future in stack:
+            future.cancel()
+
+
+def list_files(
+    directory: str = ".", offset: int = 0, limit: int | None = MAX_FILES_LIMIT
+) -> list[str]:
     """
     Lists all files in the given directory (recursive), ignoring specific directories.
     Returns a list of relative file paths.
+
+    Args:
+        directory: The directory to list, relative to the codebase root. Defaults to ".".
+        offset: Number of files to skip, for paging through large listings. Defaults to 0.
+        limit: Maximum number of files to return. Defaults to 500. None returns all files.
     """
     logger.debug("Scanning files in: %s", CODEBASE_ROOT)
-    files_list = []
 
     try:
         base_path = _validate_path(directory)
     except ValueError as e:
         return [f"Error: {str(e)}"]
 
-    if not os.path.exists(base_path):
-        return [f"Error: Directory {directory} does not exist."]
-
     spec = load_gitignore_spec()
 
-    for root, dirs, files in os.walk(base_path):
-        # Calculate relative path from CODEBASE_ROOT to current 'root'
-        # This is needed to check ignores which are relative to git root
-        rel_root = os.path.relpath(root, CODEBASE_ROOT)
-        if rel_root == ".":
-            rel_root = ""
-
-        # Filter directories in-place to prevent recursion into ignored ones
-        # We iterate over a copy of dirs so we can modify dirs safely
-        valid_dirs = []
-        for d in dirs:
-            # Construct path relative to repo root
-            d_path = os.path.join(rel_root, d)
-            # Check if directory matches ignore patterns
-            # Append slash to ensure it matches directory-only patterns like "dir/"
-            if not spec.match_file(d_path + "/"):
-                valid_dirs.append(d)
-
-        # Update dirs in-place to prune traversal
-        dirs[:] = valid_dirs
-
-        for file in files:
-            rel_path = os.path.join(rel_root, file)
-            if not spec.match_file(rel_path):
-                files_list.append(rel_path)
+    # Paths are reported relative to CODEBASE_ROOT, since ignores are relative to git root
+    root_prefix = os.path.abspath(CODEBASE_ROOT).rstrip(os.sep) + os.sep
+    rel_dir = base_path[len(root_prefix) :]
+    dir_prefix = rel_dir + "/" if rel_dir else ""
+
+    git_files = _git_file_list()
+    if git_files is None:
+        files = _walk_files(base_path, dir_prefix, spec)
+    else:
+        # Git already tracks the tree in .git/index; filter its listing instead
+        files = (path for path in git_files if path.startswith(dir_prefix))
+
+    # The walk is lazy, so only offset + limit (+1 to detect more) entries are visited
+    offset = max(0, offset)
+    stop = None if limit is None else offset + limit + 1
+    files_list = list(itertools.islice(files, offset, stop))
+
+    # Only an empty result can mean the directory is missing, so the stat is
+    # skipped for every listing that found something
+    if not files_list and not os.path.exists(base_path):
+        return [f"Error: Directory {directory} does not exist."]
 
     logger.debug("Found %d files.", len(files_list))
 
-    if len(files_list) > MAX_FILES_LIMIT:
-        original_count = len(files_list)
-        files_list = files_list[:MAX_FILES_LIMIT]
+    if limit is not None and len(files_list) > limit:
+        files_list = files_list[:limit]
         files_list.append(
-            f"... [List truncated. Total files: {original_count}. "
-            "Use a specific directory or 'grep_code' to find files.]"
+            f"... [List truncated after {limit} files. Use offset={offset + limit} "
+            "to list more, or a specific directory or 'grep_code' to find files.]"
         )
 
     return files_list
 
 
+# Bytes counted per step when _skip_lines skips over whole chunks
+_NEWLINE_SCAN_CHUNK = 1 << 16
+
+
+def _skip_lines(mm: mmap.mmap, pos: int, count: int) -> int:
+    """
+    Returns the offset just past the count-th newline at or after pos, or -1 if
+    fewer newlines remain. Chunks without the target newline are counted in C
+    instead of finding their newlines one at a time.
+    """
+    size = len(mm)
+    while count > 0 and pos < size:
+        chunk_end = min(pos + _NEWLINE_SCAN_CHUNK, size)
+        in_chunk = mm[pos:chunk_end].count(b"\n")
+        if in_chunk < count:
+            count -= in_chunk
+            pos = chunk_end
+            continue
+        for _ in range(count):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+    return pos if count <= 0 else -1
+
+
+def _read_line_range_mmap(
+    full_path: str, start_idx: int, end_idx: int
+) -> tuple[str, bool, bool]:
+    """
+    Returns lines [start_idx, end_idx) of a file by scanning a memory map for newlines.
+    Also returns whether start_idx is within the file and whether lines follow end_idx.
+    """
+    with open(full_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        size = len(mm)
+        pos = _skip_lines(mm, 0, start_idx)
+        if pos == -1 or pos >= size:
+            return "", False, False
+
+        end = _skip_lines(mm, pos, end_idx - start_idx)
+        if end == -1:
+            end = size
+
+        # Match the newline translation of reading in text mode
+        content = mm[pos:end].decode("utf-8").replace("\r\n", "\n")
+        return content, True, end < size
+
+
+@lru_cache(maxsize=64)
+def _read_line_range(
+    full_path: str, mtime_ns: int, size: int, start_idx: int, end_idx: int
+) -> tuple[str, bool, bool]:
+    """
+    Returns lines [start_idx, end_idx) of a file, whether start_idx is within
+    the file and whether lines follow end_idx. Cached per (mtime_ns, size), so
+    repeated reads of an unchanged file (e.g. read_file then get_file_outline)
+    don't touch the disk; any edit changes the key.
+    """
+    if size > MMAP_READ_THRESHOLD:
+        return _read_line_range_mmap(full_path, start_idx, end_idx)
+
+    with open(full_path, "r", encoding="utf-8") as f:
+        # Only the requested window is kept; reading stops one line past it,
+        # which is enough to know whether to truncate
+        lines = list(itertools.islice(f, start_idx, end_idx))
+        has_more = f.readline() != ""
+    return "".join(lines), bool(lines), has_more
+
+
 def read_file(filepath: str, start_line: int = 1, end_line: int = None) -> str:
     """
     Reads and returns the text content of a file.
@@ -499,53 +1089,105 @@ def read_file(filepath: str, start_line: int = 1, end_line: int = None) -> str:
     except ValueError as e:
         return f"Error: {str(e)}"
 
-    if not os.path.exists(full_path):
-        return f"Error: File {filepath} not found."
+    # Determine slice range
+    # 1-based indexing for input, 0-based for slicing
+    start_idx = max(0, start_line - 1)
+    limit_end = start_line + MAX_READ_LINES - 1
+    end_idx = limit_end if end_line is None else min(end_line, limit_end)
+    # An end before the start is an empty range, not a negative slice
+    end_idx = max(end_idx, start_idx)
 
     try:
-        with open(full_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            total_lines = len(lines)
+        st = os.stat(full_path)
+        content, in_bounds, has_more = _read_line_range(
+            full_path, st.st_mtime_ns, st.st_size, start_idx, end_idx
+        )
+    except FileNotFoundError:
+        return f"Error: File {filepath} not found."
+    except OSError as e:
+        return f"Error reading file: {str(e)}"
 
-            # Determine slice range
-            # 1-based indexing for input, 0-based for slicing
-            start_idx = max(0, start_line - 1)
+    # Handle out of bounds gracefully
+    if not in_bounds:
+        return ""
 
-            limit_end = start_line + MAX_READ_LINES - 1
-            truncated_by_limit = False
+    truncated_by_limit = end_line > limit_end if end_line is not None else has_more
+    if truncated_by_limit:
+        content += (
+            f"\n... [Truncated. Read limit is {MAX_READ_LINES} lines. "
+            f"Use start_line={end_idx+1} to read more.]"
+        )
 
-            if end_line is None:
-                if total_lines > limit_end:
-                    end_idx = limit_end
-                    truncated_by_limit = True
-                else:
-                    end_idx = total_lines
-            else:
-                if end_line > limit_end:
-                    end_idx = limit_end
-                    truncated_by_limit = True
-                else:
-                    end_idx = end_line
+    return content
 
-            # Handle out of bounds gracefully
-            if start_idx >= total_lines:
-                return ""
 
-            # Python list slicing handles end_idx > len gracefully
-            content = "".join(lines[start_idx:end_idx])
+def _head_sha() -> str | None:
+    """Resolves HEAD to a commit sha by reading the git directory, or None."""
+    git_dir = _git_dir()
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.readline().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        # Detached HEAD holds the sha itself
+        return head or None
+    ref = head[len("ref: ") :]
+
+    # Linked worktrees keep branch refs in the main repository's git directory
+    common_dir = _git_common_dir(git_dir)
 
-            if truncated_by_limit:
-                content += (
-                    f"\n... [Truncated. Read limit is {MAX_READ_LINES} lines. "
-                    f"Use start_line={end_idx+1} to read more.]"
-                )
+    try:
+        with open(os.path.join(common_dir, ref), "r", encoding="utf-8") as f:
+            return f.readline().strip() or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None
 
-            return content
 
-    except OSError as e:
-        return f"Error reading file: {str(e)}"
+# (function name, args, kwargs, codebase root, HEAD sha) -> (time, output)
+_GIT_LOG_CACHE: dict[tuple, tuple[float, str]] = {}
+
 
+def _memoize_on_head(func):
+    """
+    Caches a git log helper's output until HEAD moves to another commit (or
+    GIT_LOG_CACHE_TTL passes), so repeated calls don't fork git. Error results
+    and calls made while HEAD can't be resolved are not cached.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        sha = _head_sha()
+        if sha is None:
+            return func(*args, **kwargs)
+
+        key = (func.__name__, args, tuple(sorted(kwargs.items())), CODEBASE_ROOT, sha)
+        now = time.monotonic()
+        cached = _GIT_LOG_CACHE.get(key)
+        if cached is not None and now - cached[0] < GIT_LOG_CACHE_TTL:
+            return cached[1]
+
+        result = func(*args, **kwargs)
+        if not result.startswith("Error"):
+            if len(_GIT_LOG_CACHE) >= GIT_LOG_CACHE_SIZE:
+                # Dicts keep insertion order, so this drops the oldest entry
+                del _GIT_LOG_CACHE[next(iter(_GIT_LOG_CACHE))]
+            _GIT_LOG_CACHE[key] = (now, result)
+        return result
 
+    return wrapper
+
+
+@_memoize_on_head
 def get_file_history(filepath: str, max_count: int = 10) -> str:
     """
     Retrieves the git history for a specific file.
@@ -597,6 +1239,7 @@ def get_file_history(filepath: str, max_count: int = 10) -> str:
         return f"Error retrieving history: {str(e)}"
 
 
+@_memoize_on_head
 def get_recent_commits(max_count: int = 10) -> str:
     """
     Retrieves the most recent commits for the repository.
@@ -641,12 +1284,14 @@ def grep_code(query: str, case_sensitive: bool = False) -> str:
         case_sensitive: Whether the search should be case-sensitive. Defaults to False.
 
     Returns:
-        A string containing the search results (truncated to 2000 chars), or an error message.
+        A string containing the search results (truncated to GREP_OUTPUT_LIMIT chars),
+        or an error message.
     """
     try:
         # Determine grep command
-        # Preferred: git grep -n [-i] "query"
-        cmd = ["git", "grep", "-n"]
+        # Preferred: git grep -n -m <limit> [-i] "query"
+        max_count = str(GREP_OUTPUT_LIMIT)
+        cmd = ["git", "grep", "-n", "-m", max_count]
 
         if not case_sensitive:
             cmd.append("-i")
@@ -659,8 +1304,8 @@ def grep_code(query: str, case_sensitive: bool = False) -> str:
         is_git_repo = os.path.exists(os.path.join(CODEBASE_ROOT, ".git"))
 
         if not is_git_repo:
-            # Fallback to standard grep: grep -r -n [-i] -e "query" .
-            cmd = ["grep", "-r", "-n"]
+            # Fallback to standard grep: grep -r -n -m <limit> [-i] -e "query" .
+            cmd = ["grep", "-r", "-n", "-m", max_count]
             if not case_sensitive:
                 cmd.append("-i")
             # Use -e to prevent argument injection if query starts with -
@@ -668,27 +1313,36 @@ def grep_code(query: str, case_sensitive: bool = False) -> str:
             cmd.append(query)
             cmd.append(".")
 
-        # Execute
-        result = subprocess.run(
+        # Execute. stderr goes to a file so a noisy grep can't block on a full
+        # pipe while only stdout is being read.
+        with tempfile.TemporaryFile() as stderr_file, subprocess.Popen(
             cmd,
             cwd=CODEBASE_ROOT,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
             text=True,
-            check=False,  # Don't raise on grep exit code 1 (no matches)
-        )
+        ) as proc:
+            # Anything past the limit would be discarded, so stop reading (and
+            # searching) as soon as one more character arrives
+            output = proc.stdout.read(GREP_OUTPUT_LIMIT + 1)
+            if len(output) > GREP_OUTPUT_LIMIT:
+                proc.kill()
+                return (
+                    output[:GREP_OUTPUT_LIMIT]
+                    + f"\n... [Output truncated to {GREP_OUTPUT_LIMIT} chars]"
+                )
+            # Don't raise on grep exit code 1 (no matches)
+            returncode = proc.wait()
 
-        output = result.stdout
-        if result.returncode > 1:
-            # Grep error (exit code 2 usually)
-            return f"Error executing grep: {result.stderr or 'Unknown error'}"
+            if returncode > 1:
+                # Grep error (exit code 2 usually)
+                stderr_file.seek(0)
+                error = stderr_file.read().decode("utf-8", "replace")
+                return f"Error executing grep: {error or 'Unknown error'}"
 
         if not output:
             return "No matches found."
 
-        # Truncate
-        if len(output) > 2000:
-            return output[:2000] + "\n... [Output truncated to 2000 chars]"
-
         return output
 
     except (subprocess.SubprocessError, OSError) as e:
@@ -697,7 +1351,12 @@ def grep_code(query: str, case_sensitive: bool = False) -> str:
 
 
 def _get_outline_python(content: str) -> list[str]:
-    """Helper to outline Python files."""
+    """
+    Helper to outline Python files.
+
+    Files that don't parse are still outlined approximately with a line scan,
+    after the syntax error.
+    """
     outline = []
     try:
         tree = ast.parse(content)
@@ -713,14 +1372,44 @@ def _get_outline_python(content: str) -> list[str]:
                         )
     except SyntaxError as e:
         outline.append(f"Error parsing Python file: {e}")
+        outline.extend(_scan_outline_python(content))
+    return outline
+
+
+def _scan_outline_python(content: str) -> list[str]:
+    """Approximate line-regex outline, used when a Python file doesn't parse."""
+    outline = []
+    in_class = False
+    lineno = 1
+    pos = 0
+    for match in PYTHON_OUTLINE_PATTERN.finditer(content):
+        lineno += content.count("\n", pos, match.start())
+        pos = match.start()
+        if match.group("method"):
+            if in_class:
+                outline.append(
+                    f"  Line {lineno}: def {match.group('method_name')}(...)"
+                )
+        elif match.group("kind") == "class":
+            in_class = True
+            outline.append(f"Line {lineno}: class {match.group('name')}")
+        elif match.group("kind"):
+            in_class = False
+            outline.append(f"Line {lineno}: def {match.group('name')}(...)")
+        elif content[pos] != "@":
+            # Any other top-level statement closes the class body
+            in_class = False
     return outline
 
 
 def _get_outline_kotlin(content: str) -> list[str]:
     """Helper to outline Kotlin files."""
     outline = []
+    lineno = 1
+    pos = 0
     for match in KOTLIN_OUTLINE_PATTERN.finditer(content):
-        lineno = content[: match.start()].count("\n") + 1
+        lineno += content.count("\n", pos, match.start())
+        pos = match.start()
         signature = match.group(1).strip().replace("\n", " ")
         signature = WHITESPACE_PATTERN.sub(" ", signature)
         outline.append(f"Line {lineno}: {signature}")
@@ -730,10 +1419,12 @@ def _get_outline_kotlin(content: str) -> list[str]:
 def _get_outline_js(content: str) -> list[str]:
     """Helper to outline JS/TS files."""
     outline = []
-    for i, line in enumerate(content.splitlines(), 1):
-        match = JS_OUTLINE_PATTERN.search(line)
-        if match:
-            outline.append(f"Line {i}: {match.group(0).strip()}")
+    lineno = 1
+    pos = 0
+    for match in JS_OUTLINE_PATTERN.finditer(content):
+        lineno += content.count("\n", pos, match.start())
+        pos = match.start()
+        outline.append(f"Line {lineno}: {match.group(0).strip()}")
     return outline
 
 
@@ -754,7 +1445,16 @@ def get_file_outline(filepath: str) -> str:
         return content
 
     ext = os.path.splitext(filepath)[1].lower()
+    return _outline_content(ext, content)
+
 
+@lru_cache(maxsize=128)
+def _outline_content(ext: str, content: str) -> str:
+    """
+    Builds the outline text for file content. Keyed on the content itself
+    (which read_file serves from its stat-keyed cache), so an edited file is
+    re-outlined and an unchanged one is not parsed again.
+    """
     if ext == ".py":
         outline = _get_outline_python(content)
     elif ext == ".kt":
@@ -770,27 +1470,15 @@ def get_file_outline(filepath: str) -> str:
     return "\n".join(outline)
 
 
-def _is_entry_point(activity, ns):
-    """Helper to check if an activity is a main entry point."""
-    ns_uri = ns["android"]
-    for intent_filter in activity.findall("intent-filter"):
-        has_main = False
-        has_launcher = False
-        for action in intent_filter.findall("action"):
-            name = action.get(f"{{{ns_uri}}}name")
-            if not name:
-                name = action.get("android:name")
-            if name == "android.intent.action.MAIN":
-                has_main = True
-        for category in intent_filter.findall("category"):
-            name = category.get(f"{{{ns_uri}}}name")
-            if not name:
-                name = category.get("android:name")
-            if name == "android.intent.category.LAUNCHER":
-                has_launcher = True
-        if has_main and has_launcher:
-            return True
-    return False
+# android:name as ElementTree reports it (namespace URI in braces)
+_ANDROID_NAME_ATTR = "{http://schemas.android.com/apk/res/android}name"
+_MANIFEST_ACTIVITY_PATH = ("application", "activity")
+_MANIFEST_FILTER_PATH = ("application", "activity", "intent-filter")
+
+
+def _android_name(elem) -> str | None:
+    """Returns an element's android:name, with or without a bound namespace."""
+    return elem.get(_ANDROID_NAME_ATTR) or elem.get("android:name")
 
 
 def read_android_manifest(manifest_path: str = None) -> str:
@@ -811,31 +1499,43 @@ def read_android_manifest(manifest_path: str = None) -> str:
         return content
 
     try:
-        # Strip XML declaration if present to avoid parsing issues with strings
-        # ElementTree.fromstring can handle it, but sometimes encoding declarations cause issues
-        root = ET.fromstring(content)
-
-        # Handle XML namespaces
-        # (android:name usually maps to http://schemas.android.com/apk/res/android)
-        ns = {"android": "http://schemas.android.com/apk/res/android"}
-
-        package = root.get("package", "Unknown")
-
+        package = "Unknown"
         permissions = []
-        for elem in root.findall("uses-permission"):
-            # Try with namespace first, then without
-            name = elem.get(f"{{{ns['android']}}}name") or elem.get("android:name")
-            if name:
-                permissions.append(name)
-
         activities = []
-        for app_elem in root.findall("application"):
-            for activity in app_elem.findall("activity"):
-                name = activity.get(f"{{{ns['android']}}}name")
-                if not name:
-                    name = activity.get("android:name")
-                is_entry = _is_entry_point(activity, ns)
+        # Tags from the root down to the current element. Each element is
+        # cleared once handled, so memory follows the nesting depth rather
+        # than the size of the manifest.
+        path = []
+        is_entry = has_main = has_launcher = False
+
+        events = ET.iterparse(io.StringIO(content), events=("start", "end"))
+        for event, elem in events:
+            if event == "start":
+                if not path:
+                    package = elem.get("package", "Unknown")
+                path.append(elem.tag)
+                continue
+
+            parents = tuple(path[1:-1])
+            tag = path.pop()
+            if tag == "uses-permission" and not parents:
+                name = _android_name(elem)
+                if name:
+                    permissions.append(name)
+            elif parents == _MANIFEST_FILTER_PATH:
+                name = _android_name(elem)
+                if tag == "action" and name == "android.intent.action.MAIN":
+                    has_main = True
+                elif tag == "category" and name == "android.intent.category.LAUNCHER":
+                    has_launcher = True
+            elif tag == "intent-filter" and parents == _MANIFEST_ACTIVITY_PATH:
+                is_entry = is_entry or (has_main and has_launcher)
+                has_main = has_launcher = False
+            elif tag == "activity" and parents == ("application",):
+                name = _android_name(elem)
                 activities.append(f"{name}{' [ENTRY POINT]' if is_entry else ''}")
+                is_entry = False
+            elem.clear()
 
         output = [
             f"Package: {package}",
@@ -853,13 +1553,13 @@ def read_android_manifest(manifest_path: str = None) -> str:
 
 def _validate_definition_target(target_path: str) -> None:
     """Validates that the target definition path is within the codebase."""
-    try:
-        target_path_abs = os.path.abspath(target_path)
-        root_abs = os.path.abspath(CODEBASE_ROOT)
-        if os.path.commonpath([target_path_abs, root_abs]) != root_abs:
-            raise ValueError("Access denied. Definition is outside of codebase.")
-    except ValueError as e:
-        raise ValueError("Access denied. Definition is outside of codebase.") from e
+    target_path_abs = os.path.abspath(target_path)
+    root_abs = os.path.abspath(CODEBASE_ROOT)
+    # Prefix check with a trailing separator, so "/codebase2" doesn't pass
+    if target_path_abs != root_abs and not target_path_abs.startswith(
+        root_abs.rstrip(os.sep) + os.sep
+    ):
+        raise ValueError("Access denied. Definition is outside of codebase.")
 
 
 async def get_definition(file_path: str, line: int, col: int) -> dict:
@@ -951,6 +1651,7 @@ def write_file_safe(filepath: str, content: str) -> str:
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         with open(full_path, "w", encoding="utf-8") as f:
             f.write(content)
+        clear_file_list_cache()
         return f"Successfully wrote to {filepath}"
     except ValueError as e:
         return f"Error: {str(e)}"
@@ -1032,6 +1733,7 @@ def write_to_docs(filepath: str, content: str) -> str:
             # Write the file directly
             with open(full_path, "w", encoding="utf-8") as f:
                 f.write(content)
+            clear_file_list_cache()
             return f"Successfully wrote to {filepath}"
 
         docs_root = os.path.abspath(os.path.join(CODEBASE_ROOT, "docs"))
@@ -1059,6 +1761,7 @@ def write_to_docs(filepath: str, content: str) -> str:
         # Write the file
         with open(full_path, "w", encoding="utf-8") as f:
             f.write(content)
+        clear_file_list_cache()
 
         return f"Successfully wrote to {filepath}"
 
@@ -1085,6 +1788,7 @@ def create_branch(branch_name: str) -> bool:
             capture_output=True,
             text=True,
         )
+        clear_repo_info_cache()
         return True
     except subprocess.CalledProcessError as e:
         logger.error("Error creating branch %s: %s", branch_name, e.stderr)
@@ -1140,10 +1844,47 @@ def get_pr_diff(pr_number: int) -> str:
         return f"Error retrieving PR diff: {str(e)}"
 
 
+def _read_local_branches() -> list[str] | None:
+    """
+    Lists local branches from .git/refs/heads and .git/packed-refs without forking git.
+    Returns None if the refs can't be read, so callers can fall back to git.
+    """
+    git_dir = _git_common_dir()
+    heads_dir = os.path.join(git_dir, "refs", "heads")
+    if not os.path.isdir(heads_dir):
+        return None
+
+    branches = set()
+    for root, _, files in os.walk(heads_dir):
+        rel_root = os.path.relpath(root, heads_dir)
+        for name in files:
+            branches.add(name if rel_root == "." else f"{rel_root}/{name}")
+
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                # Lines are "<sha> refs/heads/<name>"; skip comments and peeled tags
+                _, _, ref = line.strip().partition(" ")
+                if ref.startswith("refs/heads/"):
+                    branches.add(ref[len("refs/heads/") :])
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Failed to read packed-refs: %s", e)
+        return None
+
+    # Same order as `git branch`
+    return sorted(branches)
+
+
 def get_branches() -> list[str]:
     """
     Returns a list of local git branches.
     """
+    branches = _read_local_branches()
+    if branches is not None:
+        return branches
+
     try:
         result = subprocess.run(
             ["git", "branch", "--format=%(refname:short)"],
@@ -1174,6 +1915,7 @@ def switch_branch(branch_name: str) -> dict:
             text=True,
             check=True,
         )
+        clear_repo_info_cache()
         return {"success": True, "output": result.stdout or result.stderr}
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr or e.stdout
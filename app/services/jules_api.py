@@ -2,12 +2,79 @@
 Service module for interacting with the Jules API.
 """
 
+import asyncio
 import logging
 import os
+from functools import lru_cache
 import aiohttp
 
 logger = logging.getLogger(__name__)
 
+JULES_API_URL = "https://jules.googleapis.com/v1alpha"
+JULES_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# One client session (connection pool, DNS cache, TLS connections) shared by
+# all Jules calls. Created lazily on the running loop; closed on shutdown.
+_SESSION = {"session": None, "loop": None}
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Returns the shared Jules client session, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    session = _SESSION["session"]
+    if session is None or session.closed or _SESSION["loop"] is not loop:
+        if session is not None and not session.closed:
+            # Created on an earlier event loop: close it rather than leak its
+            # connector. Its pooled connections are dropped (they can't be
+            # reused across loops), which is safe even if that loop is closed.
+            await session.close()
+        session = aiohttp.ClientSession(
+            timeout=JULES_TIMEOUT,
+            # 75s keepalive matches common server (nginx) idle timeouts, so
+            # pooled connections are reused rather than closed under us
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=75
+            ),
+        )
+        _SESSION.update(session=session, loop=loop)
+    return session
+
+
+async def _request(method: str, url: str, api_key: str, **kwargs) -> dict:
+    """Sends an authenticated request on the shared session and returns its JSON."""
+    headers = {"X-Goog-Api-Key": api_key, "Content-Type": "application/json"}
+    try:
+        client = await _get_session()
+        async with client.request(method, url, headers=headers, **kwargs) as response:
+            if response.status != 200:
+                text = await response.text()
+                logger.error("Jules API Error: %s - %s", response.status, text)
+                raise RuntimeError(f"Jules API Error: {response.status} - {text}")
+            return await response.json()
+    except aiohttp.ClientError as e:
+        logger.error("Request failed: %s", e)
+        raise
+
+
+@lru_cache(maxsize=1)
+def _get_api_key() -> str:
+    """
+    Returns the Jules API key from the environment. The key is resolved once per
+    process; a missing key raises and is looked up again on the next call.
+    """
+    api_key = os.environ.get("JULES_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("JULES_API_KEY or GOOGLE_API_KEY not set")
+    return api_key
+
+
+async def close_jules_session():
+    """Closes the shared Jules client session. Called on app shutdown."""
+    session = _SESSION["session"]
+    _SESSION.update(session=None, loop=None)
+    if session is not None and not session.closed:
+        await session.close()
+
 
 async def deploy_to_jules(prompt_text, repo_info):
     """
@@ -25,9 +92,7 @@ async def deploy_to_jules(prompt_text, repo_info):
         RuntimeError: If the Jules API returns an error.
         aiohttp.ClientError: If the HTTP request fails.
     """
-    api_key = os.environ.get("JULES_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("JULES_API_KEY or GOOGLE_API_KEY not set")
+    api_key = _get_api_key()
 
     source_id = repo_info.get("source_id")
     branch = repo_info.get("branch", "main")
@@ -35,9 +100,6 @@ async def deploy_to_jules(prompt_text, repo_info):
     if not source_id:
         raise ValueError("Could not detect Git repository Source ID.")
 
-    url = "https://jules.googleapis.com/v1alpha/sessions"
-    headers = {"X-Goog-Api-Key": api_key, "Content-Type": "application/json"}
-
     payload = {
         "prompt": prompt_text,
         "sourceContext": {
@@ -49,19 +111,7 @@ async def deploy_to_jules(prompt_text, repo_info):
 
     logger.debug("Deploying to Jules with payload: %s", payload)
 
-    try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as client:
-            async with client.post(url, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    logger.error("Jules API Error: %s - %s", response.status, text)
-                    raise RuntimeError(f"Jules API Error: {response.status} - {text}")
-
-                return await response.json()
-    except aiohttp.ClientError as e:
-        logger.error("Request failed: %s", e)
-        raise
+    return await _request("POST", f"{JULES_API_URL}/sessions", api_key, json=payload)
 
 
 async def get_session_status(session_name):
@@ -79,22 +129,6 @@ async def get_session_status(session_name):
         RuntimeError: If the Jules API returns an error.
         aiohttp.ClientError: If the HTTP request fails.
     """
-    api_key = os.environ.get("JULES_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("JULES_API_KEY or GOOGLE_API_KEY not set")
-
-    url = f"https://jules.googleapis.com/v1alpha/{session_name}"
-    headers = {"X-Goog-Api-Key": api_key, "Content-Type": "application/json"}
+    api_key = _get_api_key()
 
-    try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as client:
-            async with client.get(url, headers=headers) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    logger.error("Jules API Error: %s - %s", response.status, text)
-                    raise RuntimeError(f"Jules API Error: {response.status} - {text}")
-                return await response.json()
-    except aiohttp.ClientError as e:
-        logger.error("Request failed: %s", e)
-        raise
+    return await _request("GET", f"{JULES_API_URL}/{session_name}", api_key)
@@ -13,6 +13,7 @@ import logging
 import traceback
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Protocol, Any
 
@@ -66,6 +67,9 @@ class BaseLLMService(Protocol):
 
 logger = logging.getLogger(__name__)
 
+# Bold "**topic**" headings in streamed thoughts
+THOUGHT_TOPIC_PATTERN = re.compile(r"\*\*(.*?)\*\*")
+
 # Global cache state
 CACHE_STATE = {}
 ACP_CLI_SESSION_ID = None
@@ -83,6 +87,16 @@ def clear_cache():
     ACP_CLI_SESSION_ID = None
 
 
+@lru_cache(maxsize=64)
+def _function_declaration(client, tool) -> types.FunctionDeclaration:
+    """
+    Builds the declaration for a tool function. from_callable introspects the
+    signature and docstring into a schema, which is the same on every turn, so
+    it is done once per (client, function).
+    """
+    return types.FunctionDeclaration.from_callable(client=client, callable=tool)
+
+
 def get_tool_config(
     client, enable_search, enable_embeddings=True, write_access_enabled=False
 ):
@@ -91,47 +105,28 @@ def get_tool_config(
     # be on for any write tool to be offered, regardless of persona capability.
     write_access_enabled = write_access_enabled and config.WRITE_ACCESS_ENABLED
     function_declarations = [
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.list_files
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.read_file
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.get_file_history
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.get_recent_commits
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.grep_code
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.get_file_outline
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.read_android_manifest
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=git_ops.get_definition
-        ),
-        types.FunctionDeclaration.from_callable(
-            client=client, callable=web_ops.fetch_url
-        ),
+        _function_declaration(client, tool)
+        for tool in (
+            git_ops.list_files,
+            git_ops.read_file,
+            git_ops.get_file_history,
+            git_ops.get_recent_commits,
+            git_ops.grep_code,
+            git_ops.get_file_outline,
+            git_ops.read_android_manifest,
+            git_ops.get_definition,
+            web_ops.fetch_url,
+        )
     ]
 
     if write_access_enabled:
         function_declarations.append(
-            types.FunctionDeclaration.from_callable(
-                client=client, callable=git_ops.write_to_docs
-            )
+            _function_declaration(client, git_ops.write_to_docs)
         )
 
     if enable_embeddings:
         function_declarations.append(
-            types.FunctionDeclaration.from_callable(
-                client=client, callable=rag_manager.search_codebase_semantic
-            )
+            _function_declaration(client, rag_manager.search_codebase_semantic)
         )
 
     # Append MCP tools, filtered by write capability
@@ -189,9 +184,67 @@ def prepare_messages(user_msg, media):
     return storage_parts, gemini_msg
 
 
-def format_history(
-    history, include_last: bool = False
-):  # pylint: disable=too-many-branches
+@lru_cache(maxsize=32)
+def _inline_data_part(mime_type: str, data: str) -> types.Part:
+    """
+    Decodes a stored base64 attachment into a Part. History is re-formatted on
+    every turn, so earlier images are decoded once instead of once per turn.
+    The parsed parts (and their data strings, whose hash Python caches) are
+    shared across loads, making repeat lookups cheap.
+    """
+    return types.Part(
+        inline_data=types.Blob(mime_type=mime_type, data=base64.b64decode(data))
+    )
+
+
+# Formatted messages keyed by their database id. Stored messages never change,
+# so each one is converted to Parts once instead of on every request.
+_FORMATTED_MESSAGES = {}
+_FORMATTED_MESSAGES_MAX = 1024
+
+
+def _format_message(message: dict) -> dict:
+    """Converts one stored message to a Gemini content dict."""
+    role = message["role"]
+
+    parts = []
+    has_function_response = False
+    for p in message.get("parts", []):
+        if isinstance(p, dict):
+            if "functionResponse" in p:
+                has_function_response = True
+                parts.append(
+                    types.Part.from_function_response(
+                        name=p["functionResponse"]["name"],
+                        response=p["functionResponse"]["response"],
+                    )
+                )
+            elif "functionCall" in p:
+                parts.append(
+                    types.Part.from_function_call(
+                        name=p["functionCall"]["name"],
+                        args=p["functionCall"]["args"],
+                    )
+                )
+            elif "text" in p:
+                parts.append(types.Part(text=p["text"]))
+            elif "inline_data" in p:
+                parts.append(
+                    _inline_data_part(
+                        p["inline_data"]["mime_type"], p["inline_data"]["data"]
+                    )
+                )
+        elif isinstance(p, str):
+            parts.append(types.Part(text=p))
+
+    # Map 'function' role to 'user' ONLY for legacy text-based function messages
+    if role == "function" and not has_function_response:
+        role = "user"
+
+    return {"role": role, "parts": parts}
+
+
+def format_history(history, include_last: bool = False):
     """Formats chat history for Gemini API, ensuring valid roles."""
     # Find last system message index
     start_index = 0
@@ -212,47 +265,41 @@ def format_history(
         history_for_gemini = history_subset[:-1] if history_subset else []
 
     for h in history_for_gemini:
-        role = h["role"]
-
-        parts = []
-        has_function_response = False
-        for p in h.get("parts", []):
-            if isinstance(p, dict):
-                if "functionResponse" in p:
-                    has_function_response = True
-                    parts.append(
-                        types.Part.from_function_response(
-                            name=p["functionResponse"]["name"],
-                            response=p["functionResponse"]["response"],
-                        )
-                    )
-                elif "functionCall" in p:
-                    parts.append(
-                        types.Part.from_function_call(
-                            name=p["functionCall"]["name"],
-                            args=p["functionCall"]["args"],
-                        )
-                    )
-                elif "text" in p:
-                    parts.append(types.Part(text=p["text"]))
-                elif "inline_data" in p:
-                    parts.append(
-                        types.Part(
-                            inline_data=types.Blob(
-                                mime_type=p["inline_data"]["mime_type"],
-                                data=base64.b64decode(p["inline_data"]["data"]),
-                            )
-                        )
-                    )
-            elif isinstance(p, str):
-                parts.append(types.Part(text=p))
+        msg_id = h.get("id")
+        if msg_id is None:
+            formatted_history.append(_format_message(h))
+            continue
+
+        formatted = _FORMATTED_MESSAGES.get(msg_id)
+        if formatted is None:
+            if len(_FORMATTED_MESSAGES) >= _FORMATTED_MESSAGES_MAX:
+                _FORMATTED_MESSAGES.clear()
+            formatted = _format_message(h)
+            _FORMATTED_MESSAGES[msg_id] = formatted
+        # Copy so callers can't mutate the cached entry
+        formatted_history.append(
+            {"role": formatted["role"], "parts": list(formatted["parts"])}
+        )
+    return formatted_history
 
-        # Map 'function' role to 'user' ONLY for legacy text-based function messages
-        if role == "function" and not has_function_response:
-            role = "user"
 
-        formatted_history.append({"role": role, "parts": parts})
-    return formatted_history
+def _approx_char_count(system_instruction: str, history: list, limit: int) -> int:
+    """
+    Approximates the size of a request in characters, stopping once limit is
+    reached. Text parts count their text; other parts (function calls and
+    responses, inline data) count their string form.
+    """
+    total = len(system_instruction)
+    for message in history:
+        for part in message.get("parts", []):
+            if isinstance(part, dict):
+                text = part.get("text")
+            else:
+                text = getattr(part, "text", None)
+            total += len(text) if text else len(str(part))
+            if total >= limit:
+                return total
+    return total
 
 
 def get_cached_content_config(  # pylint: disable=too-many-locals
@@ -279,27 +326,26 @@ def get_cached_content_config(  # pylint: disable=too-many-locals
     if docs_content:
         system_instruction += f"\n\n### Architectural Guides\n{docs_content}"
 
-    sys_hash = str(hash(system_instruction))
+    sys_hash = hash(system_instruction)
 
     # 1. Attempt Reuse
     if CACHE_STATE:
         cached_count = CACHE_STATE.get("message_count", 0)
         cached_sys_hash = CACHE_STATE.get("system_instruction_hash")
-        cached_content_hash = CACHE_STATE.get("content_hash")
 
         if cached_sys_hash == sys_hash and len(full_history) >= cached_count:
-            prefix = full_history[:cached_count]
-            # Verify prefix matches cached content
-            if str(hash(str(prefix))) == cached_content_hash:
+            # Verify prefix matches cached content. Comparing the messages
+            # directly stops at the first difference and, unlike hashing
+            # str(prefix), never serializes the whole history.
+            if full_history[:cached_count] == CACHE_STATE.get("contents"):
                 delta_history = full_history[cached_count:]
                 # Reuse if delta isn't too large (e.g. < 20 messages)
                 if len(delta_history) <= 20:
                     return CACHE_STATE["name"], delta_history
 
     # 2. Check if eligible for new cache
-    total_text = str(system_instruction) + str(full_history)
     # Threshold: ~100k chars (approx 25k tokens, safe buffer for 32k requirement)
-    if len(total_text) < 100000:
+    if _approx_char_count(system_instruction, full_history, 100000) < 100000:
         # Too small, verify if we should clear stale cache
         if CACHE_STATE and len(full_history) < CACHE_STATE.get("message_count", 0):
             CACHE_STATE.clear()
@@ -319,7 +365,7 @@ def get_cached_content_config(  # pylint: disable=too-many-locals
         CACHE_STATE = {
             "name": cache.name,
             "message_count": len(full_history),
-            "content_hash": str(hash(str(full_history))),
+            "contents": list(full_history),
             "system_instruction_hash": sys_hash,
         }
 
@@ -338,11 +384,22 @@ async def stream_generator(queue: asyncio.Queue):
     Handles client disconnects gracefully.
     """
     try:
-        while True:
+        done = False
+        while not done:
             item = await queue.get()
             if item is None:
                 break
-            yield item
+            # Coalesce events already waiting (token bursts, replayed buffers)
+            # into one chunk. Each item is a complete SSE event, so the
+            # concatenation is still a valid event stream.
+            batch = [item]
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            yield "".join(batch)
     except GeneratorExit:
         logger.warning(
             "Client disconnected from stream. Worker continues in background."
@@ -888,7 +945,9 @@ class ACPClientHandler(Client):
 
             # 3. Extract and send topic
             self.thought_broadcast_buffer += text
-            matches = list(re.finditer(r"\*\*(.*?)\*\*", self.thought_broadcast_buffer))
+            matches = list(
+                THOUGHT_TOPIC_PATTERN.finditer(self.thought_broadcast_buffer)
+            )
             if matches:
                 last_end = 0
                 for match in matches:
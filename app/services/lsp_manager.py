@@ -4,23 +4,69 @@ Service for managing Language Server Protocol (LSP) processes.
 
 import asyncio
 import collections
+import functools
+import itertools
 import json
 import logging
 import os
 import subprocess
 import socket
 import threading
-import time
 from typing import Dict, Any, Optional
 from app.services.lsp_registry import LSPRegistry
 
 logger = logging.getLogger(__name__)
 
 
-class LSPServer:
+# Directories never scanned when detecting a workspace's languages
+_SCAN_IGNORE_DIRS = frozenset({".git", "node_modules", "venv", "__pycache__", "dist"})
+
+
+@functools.lru_cache(maxsize=1024)
+def _find_root_from(start_dir: str, markers: tuple[str, ...]) -> Optional[str]:
+    """
+    Walks up from start_dir to the first directory containing a marker or .git.
+    Cached per (directory, markers): project roots don't move while the app
+    runs, and every definition lookup in a directory would re-probe each level.
+    """
+    current_dir = start_dir
+    # Stop at root
+    while os.path.dirname(current_dir) != current_dir:
+        for marker in markers:
+            if os.path.exists(os.path.join(current_dir, marker)):
+                return current_dir
+        if os.path.exists(os.path.join(current_dir, ".git")):
+            return current_dir
+        current_dir = os.path.dirname(current_dir)
+    return None
+
+
+class LSPServer:  # pylint: disable=too-many-instance-attributes
     """Helper class to manage a single LSP process or socket and its I/O."""
 
-    # pylint: disable=too-many-instance-attributes, too-many-positional-arguments
+    # No per-instance __dict__; the reader thread touches these on every message
+    __slots__ = (
+        "process",
+        "sock",
+        "language",
+        "root_path",
+        "responses",
+        "pending",
+        "_request_ids",
+        "open_docs",
+        "docs_lock",
+        "_outbox",
+        "write_lock",
+        "stderr_buffer",
+        "lock",
+        "status",
+        "initialization_error",
+        "running",
+        "reader_thread",
+        "stderr_thread",
+    )
+
+    # pylint: disable=too-many-positional-arguments
     def __init__(
         self,
         process: Optional[subprocess.Popen],
@@ -33,7 +79,20 @@ class LSPServer:
         self.language = language
         self.root_path = root_path
         self.responses: Dict[int, Any] = {}
-        self.conditions: Dict[int, threading.Condition] = {}
+        # One Event per in-flight request; the reader sets it when the response
+        # is stored, so a response arriving before wait() starts is not lost
+        self.pending: Dict[int, threading.Event] = {}
+        # next() on itertools.count is atomic under the GIL, so ids are unique
+        # across threads without a lock
+        self._request_ids = itertools.count(1)
+        # abs_path -> ((st_mtime_ns, st_size), version) of documents this
+        # server has opened, so unchanged files aren't re-read and re-sent
+        self.open_docs: Dict[str, tuple] = {}
+        self.docs_lock = threading.Lock()
+        # Framed messages waiting to go out with the next write; the lock also
+        # keeps concurrent senders from interleaving frames on a socket
+        self._outbox: list[bytes] = []
+        self.write_lock = threading.Lock()
         self.stderr_buffer = collections.deque(maxlen=20)
         self.lock = threading.Lock()
         self.status = "initializing"
@@ -103,23 +162,22 @@ class LSPServer:
                 return
 
             while self.running and self.is_alive():
-                # Read headers
-                headers = {}
+                # Read headers. Only Content-Length matters, so header lines
+                # are checked as bytes instead of being decoded and split.
+                content_len = 0
                 while True:
                     line = infile.readline()
                     if not line:
                         self.running = False
                         return  # EOF or process died
 
-                    line_str = line.decode("utf-8", errors="ignore").strip()
-                    if not line_str:
+                    line = line.strip()
+                    if not line:
                         break  # End of headers
 
-                    parts = line_str.split(":", 1)
-                    if len(parts) == 2:
-                        headers[parts[0].strip()] = parts[1].strip()
-
-                content_len = int(headers.get("Content-Length", 0))
+                    name, sep, value = line.partition(b":")
+                    if sep and name.strip().lower() == b"content-length":
+                        content_len = int(value)
                 if content_len > 0:
                     body = infile.read(content_len)
                     if not body:
@@ -133,10 +191,11 @@ class LSPServer:
                         if "id" in msg and msg["id"] is not None:
                             req_id = msg["id"]
                             with self.lock:
-                                self.responses[req_id] = msg
-                                if req_id in self.conditions:
-                                    with self.conditions[req_id]:
-                                        self.conditions[req_id].notify()
+                                event = self.pending.get(req_id)
+                                # Late responses to timed-out requests are dropped
+                                if event is not None:
+                                    self.responses[req_id] = msg
+                                    event.set()
                         # Notifications (no id) are currently ignored or just logged
 
                     except json.JSONDecodeError as e:
@@ -152,58 +211,106 @@ class LSPServer:
         self, method: str, params: Any, timeout: float = 30.0
     ) -> Optional[Dict[str, Any]]:
         """Sends a request and waits for a response."""
-        req_id = int(time.time() * 1000000) % 10000000
+        req_id = next(self._request_ids)
         payload = {"jsonrpc": "2.0", "id": req_id, "method": method, "params": params}
 
-        condition = threading.Condition()
+        event = threading.Event()
         with self.lock:
-            self.conditions[req_id] = condition
+            self.pending[req_id] = event
 
         if not self._send_payload(payload):
             with self.lock:
-                del self.conditions[req_id]
+                del self.pending[req_id]
             return None
 
         # Wait for response
-        response = None
-        with condition:
-            if condition.wait(timeout):
-                with self.lock:
-                    response = self.responses.get(req_id)
-                    # Cleanup
-                    if req_id in self.responses:
-                        del self.responses[req_id]
-            else:
-                logger.warning(
-                    "Timeout waiting for LSP response id %s from %s",
-                    req_id,
-                    self.language,
-                )
-
+        event.wait(timeout)
         with self.lock:
-            if req_id in self.conditions:
-                del self.conditions[req_id]
+            del self.pending[req_id]
+            response = self.responses.pop(req_id, None)
+
+        if response is None:
+            logger.warning(
+                "Timeout waiting for LSP response id %s from %s",
+                req_id,
+                self.language,
+            )
 
         return response
 
-    def send_notification(self, method: str, params: Any):
-        """Sends a notification (no response expected)."""
+    def send_notification(self, method: str, params: Any, defer: bool = False):
+        """
+        Sends a notification (no response expected). A deferred notification is
+        written together with the next message instead of on its own.
+        """
         payload = {"jsonrpc": "2.0", "method": method, "params": params}
-        self._send_payload(payload)
+        self._send_payload(payload, defer=defer)
 
-    def _send_payload(self, payload: Dict[str, Any]) -> bool:
-        """Encodes and writes payload to stdin or socket."""
+    def sync_document(self, abs_path: str, language: str) -> str:
+        """
+        Makes sure the server has the current text of a file and returns its
+        URI. The first use sends didOpen; after an edit (new mtime or size) the
+        text is resent with didChange. The notification is deferred so it goes
+        out in one write with the request that needs the document. Raises
+        OSError if the file can't be read.
+        """
+        uri = f"file://{abs_path}"
+        with self.docs_lock:
+            st = os.stat(abs_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            opened = self.open_docs.get(abs_path)
+            if opened is not None and opened[0] == stamp:
+                return uri
+
+            with open(abs_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            if opened is None:
+                version = 1
+                self.send_notification(
+                    "textDocument/didOpen",
+                    {
+                        "textDocument": {
+                            "uri": uri,
+                            "languageId": language,
+                            "version": version,
+                            "text": content,
+                        }
+                    },
+                    defer=True,
+                )
+            else:
+                version = opened[1] + 1
+                self.send_notification(
+                    "textDocument/didChange",
+                    {
+                        "textDocument": {"uri": uri, "version": version},
+                        "contentChanges": [{"text": content}],
+                    },
+                    defer=True,
+                )
+            self.open_docs[abs_path] = (stamp, version)
+        return uri
+
+    def _send_payload(self, payload: Dict[str, Any], defer: bool = False) -> bool:
+        """Encodes and writes payload (plus any deferred ones) to stdin or socket."""
         if not self.running:
             return False
         try:
-            body = json.dumps(payload)
-            message = f"Content-Length: {len(body)}\r\n\r\n{body}"
-            data = message.encode("utf-8")
-            if self.process:
-                self.process.stdin.write(data)
-                self.process.stdin.flush()
-            elif self.sock:
-                self.sock.sendall(data)
+            # Compact separators keep large payloads (didOpen file text) small;
+            # Content-Length counts the encoded bytes
+            body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            framed = b"Content-Length: %d\r\n\r\n" % len(body) + body
+            with self.write_lock:
+                if defer:
+                    self._outbox.append(framed)
+                    return True
+                data = b"".join((*self._outbox, framed))
+                self._outbox.clear()
+                if self.process:
+                    self.process.stdin.write(data)
+                    self.process.stdin.flush()
+                elif self.sock:
+                    self.sock.sendall(data)
             return True
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Failed to write to LSP %s: %s", self.language, e)
@@ -414,37 +521,34 @@ class LSPManager:
         # pylint: disable=protected-access
         configs = registry._config
 
-        lang_to_extensions = {}
+        # extension -> languages, so each file name costs one dict lookup
+        ext_to_langs = {}
         for lang, config in configs.items():
-            exts = config.get("extensions", [])
-            if exts:
-                lang_to_extensions[lang] = tuple(exts)
+            for ext in config.get("extensions", []):
+                ext_to_langs.setdefault(ext, []).append(lang)
 
-        if not lang_to_extensions:
+        if not ext_to_langs:
             return []
 
-        lang_counts = {lang: 0 for lang in lang_to_extensions}
+        lang_counts = collections.Counter()
         found_languages = []
+        all_languages = {lang for langs in ext_to_langs.values() for lang in langs}
         min_file_threshold = 2
 
         for _, dirs, files in os.walk(root_path):
             # Skip common ignored directories
-            dirs[:] = [
-                d
-                for d in dirs
-                if d not in {".git", "node_modules", "venv", "__pycache__", "dist"}
-            ]
+            dirs[:] = [d for d in dirs if d not in _SCAN_IGNORE_DIRS]
 
             for file in files:
-                for lang, extensions in lang_to_extensions.items():
-                    if lang in found_languages:
-                        continue
-                    if file.endswith(extensions):
-                        lang_counts[lang] += 1
-                        if lang_counts[lang] >= min_file_threshold:
-                            found_languages.append(lang)
-
-            if len(found_languages) == len(lang_to_extensions):
+                dot = file.rfind(".")
+                if dot == -1:
+                    continue
+                for lang in ext_to_langs.get(file[dot:], ()):
+                    lang_counts[lang] += 1
+                    if lang_counts[lang] == min_file_threshold:
+                        found_languages.append(lang)
+
+            if len(found_languages) == len(all_languages):
                 break
 
         return found_languages
@@ -484,9 +588,7 @@ class LSPManager:
         if not config:
             return {"error": f"No LSP support for extension {ext}"}
 
-        language = self._get_language_name(registry, config)
-        if not language:
-            return {"error": "Language unknown"}
+        language = registry.get_language_by_extension(ext)
 
         # Find root and start server
         root_path = self._find_root(
@@ -504,44 +606,21 @@ class LSPManager:
 
         return self._request_definition(server, abs_path, language, line, col)
 
-    def _get_language_name(
-        self, registry: LSPRegistry, config: Dict[str, Any]
-    ) -> Optional[str]:
-        # pylint: disable=protected-access
-        for lang, cfg in registry._config.items():
-            if cfg == config:
-                return lang
-        return None
-
     # pylint: disable=too-many-arguments, too-many-positional-arguments
     def _request_definition(
         self, server: LSPServer, abs_path: str, language: str, line: int, col: int
     ) -> Dict[str, Any]:
-        """Helper to send didOpen and definition request."""
-        # Read file content
+        """Helper to sync the document and send a definition request."""
         try:
-            with open(abs_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            uri = server.sync_document(abs_path, language)
         except Exception as e:  # pylint: disable=broad-exception-caught
             return {"error": f"Failed to read file: {e}"}
 
-        server.send_notification(
-            "textDocument/didOpen",
-            {
-                "textDocument": {
-                    "uri": f"file://{abs_path}",
-                    "languageId": language,
-                    "version": 1,
-                    "text": content,
-                }
-            },
-        )
-
         # Request Definition (Convert 1-based to 0-based)
         response = server.send_request(
             "textDocument/definition",
             {
-                "textDocument": {"uri": f"file://{abs_path}"},
+                "textDocument": {"uri": uri},
                 "position": {"line": line - 1, "character": col - 1},
             },
         )
@@ -554,13 +633,4 @@ class LSPManager:
 
     def _find_root(self, file_path: str, markers: list[str]) -> Optional[str]:
         """Finds project root by looking for markers."""
-        current_dir = os.path.dirname(file_path)
-        # Stop at root
-        while os.path.dirname(current_dir) != current_dir:
-            for marker in markers:
-                if os.path.exists(os.path.join(current_dir, marker)):
-                    return current_dir
-            if os.path.exists(os.path.join(current_dir, ".git")):
-                return current_dir
-            current_dir = os.path.dirname(current_dir)
-        return None
+        return _find_root_from(os.path.dirname(file_path), tuple(markers))
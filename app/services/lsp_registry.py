@@ -6,7 +6,7 @@ import json
 import logging
 import os
 import shutil
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +20,14 @@ class LSPRegistry:
 
     _instance = None
     _config: Dict[str, Any] = {}
+    # extension -> (language, config), built once the catalog is loaded
+    _ext_index: Dict[str, Tuple[str, Dict[str, Any]]] = {}
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LSPRegistry, cls).__new__(cls)
             cls._instance._load_config()
+            cls._instance._build_ext_index()
         return cls._instance
 
     def _load_config(self):
@@ -63,11 +66,23 @@ class LSPRegistry:
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error loading LSP registry: %s", e)
 
+    def _build_ext_index(self):
+        """Indexes the loaded configurations by extension (first language wins)."""
+        self._ext_index = {}
+        for lang, config in self._config.items():
+            for ext in config.get("extensions", []):
+                self._ext_index.setdefault(ext, (lang, config))
+
     def get_config_by_extension(self, ext: str) -> Optional[Dict[str, Any]]:
         """
         Returns the LSP configuration for a given file extension.
         """
-        for config in self._config.values():
-            if ext in config.get("extensions", []):
-                return config
-        return None
+        entry = self._ext_index.get(ext)
+        return entry[1] if entry else None
+
+    def get_language_by_extension(self, ext: str) -> Optional[str]:
+        """
+        Returns the language name whose LSP configuration handles an extension.
+        """
+        entry = self._ext_index.get(ext)
+        return entry[0] if entry else None
@@ -3,8 +3,11 @@ Prompt Router Service.
 Manages sticky personas and intent classification for the agent.
 """
 
+import contextlib
 import json
 import os
+import re
+import tempfile
 
 import logging
 from datetime import datetime
@@ -211,13 +214,31 @@ def load_active_persona() -> str | None:
 
 def save_active_persona(key: str):
     """Saves the persona key."""
+    tmp_path = None
     try:
-        os.makedirs(os.path.dirname(PERSONA_FILE), exist_ok=True)
-        with open(PERSONA_FILE, "w", encoding="utf-8") as f:
+        persona_dir = os.path.dirname(PERSONA_FILE)
+        os.makedirs(persona_dir, exist_ok=True)
+        # Write a temp file and swap it in so readers never see a partial file.
+        # Each save gets its own temp file, so overlapping saves don't collide.
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=persona_dir,
+            prefix=os.path.basename(PERSONA_FILE) + ".",
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            tmp_path = f.name
             json.dump({"active_persona": key}, f)
+        os.replace(tmp_path, PERSONA_FILE)
+        tmp_path = None
         load_active_persona.cache_clear()
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.error("Failed to save active persona: %s", e)
+    finally:
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
 
 
 def clear_active_persona():
@@ -237,16 +258,33 @@ class Intent(BaseModel):
     task_type: str
 
 
-def classify_specialist(user_query: str) -> str | None:
+# Unambiguous keywords per specialist. A query matching exactly one of these
+# is classified locally; anything else (including generic words like
+# "workflow" or "architecture") is left to the model, which can answer NONE.
+_SPECIALIST_KEYWORDS = {
+    "UI": re.compile(r"\b(?:jetpack compose|composables?)\b", re.I),
+    "MOBILE": re.compile(r"\bandroidmanifest\.xml\b", re.I),
+    "CI_CD": re.compile(r"\b(?:github actions|dockerfile)\b", re.I),
+    "ARCHITECT": re.compile(r"\bagents\.md\b", re.I),
+}
+
+
+def _match_specialist_keywords(user_query: str) -> str | None:
+    """Returns the only specialist whose keywords match the query, if any."""
+    matches = [
+        key
+        for key, pattern in _SPECIALIST_KEYWORDS.items()
+        if pattern.search(user_query)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+@lru_cache(maxsize=1024)
+def _classify_with_model(query: str) -> str | None:
     """
-    Classifies the user query into one of the internal specialist knowledge
-    modules. Returns the specialist key (a member of SPECIALIST_PERSONAS) or
-    None when no specialist applies or on any API error (graceful: no
-    specialist knowledge is appended).
+    Asks the model for the specialist of a normalized query. Errors are
+    raised rather than returned so that only real answers are cached.
     """
-    if not CLIENT:
-        return None
-
     keys_str = ", ".join(sorted(SPECIALIST_PERSONAS))
     prompt = (
         "Classify this developer query into exactly one specialist category: "
@@ -254,24 +292,46 @@ def classify_specialist(user_query: str) -> str | None:
         "Choose the single most relevant specialist whose knowledge would help "
         "answer the query. If none of them clearly applies, return NONE.\n\n"
         "Also determine the task_type (e.g., 'question', 'feature', 'bug').\n\n"
-        f"Query: {user_query}"
+        f"Query: {query}"
     )
 
-    try:
-        response = CLIENT.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=Intent,
-                temperature=0.0,
+    response = CLIENT.models.generate_content(
+        model="gemini-3-flash-preview",
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=Intent,
+            temperature=0.0,
+            # A label pick needs no reasoning; skip thinking for latency
+            thinking_config=types.ThinkingConfig(
+                thinking_level=types.ThinkingLevel.MINIMAL
             ),
-        )
-        if response.parsed and isinstance(response.parsed, Intent):
-            category = response.parsed.persona.strip().upper()
-            if category in SPECIALIST_PERSONAS:
-                return category
+        ),
+    )
+    if response.parsed and isinstance(response.parsed, Intent):
+        category = response.parsed.persona.strip().upper()
+        if category in SPECIALIST_PERSONAS:
+            return category
+    return None
+
+
+def classify_specialist(user_query: str) -> str | None:
+    """
+    Classifies the user query into one of the internal specialist knowledge
+    modules. Returns the specialist key (a member of SPECIALIST_PERSONAS) or
+    None when no specialist applies or on any API error (graceful: no
+    specialist knowledge is appended).
+    """
+    specialist = _match_specialist_keywords(user_query)
+    if specialist:
+        return specialist
+
+    if not CLIENT:
         return None
+
+    try:
+        # Re-asked queries are answered from the cache without a model call
+        return _classify_with_model(" ".join(user_query.lower().split()))
     except errors.APIError as e:
         logger.error("APIError classifying specialist: %s", e)
         return None
@@ -280,6 +340,30 @@ def classify_specialist(user_query: str) -> str | None:
         return None
 
 
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+@lru_cache(maxsize=32)
+def _compose_instruction(
+    date_context: str,
+    core: str,
+    base: str,
+    specialist: str | None,
+    specialist_prompt: str,
+    closing: str,
+) -> str:
+    """
+    Joins the parts of a system instruction. Repeated turns with the same
+    parts get the same string object back, so its hash is computed only once.
+    """
+    parts = [date_context, core]
+    if base:
+        parts.append(base)
+    if specialist and specialist_prompt:
+        parts.append(f"### Specialist Knowledge: {specialist}\n{specialist_prompt}")
+    if closing:
+        parts.append(closing)
+    return "\n\n".join(parts)
+
+
 def get_system_instruction(
     persona_key: str, user_msg: str | None = None, for_cli: bool = False
 ) -> str:
@@ -292,25 +376,18 @@ def get_system_instruction(
     core = CLI_CORE_INSTRUCTION if for_cli else CORE_INSTRUCTION
     base = PERSONA_PROMPTS.get(persona_key, "")
 
-    parts = [date_context, core]
-    if base:
-        parts.append(base)
-
     # Append the most relevant specialist knowledge module, but only when an
     # actual user message is present (the status-poll token-count path passes
     # no message, so it must not trigger an LLM call on every poll).
-    if user_msg:
-        specialist = classify_specialist(user_msg)
-        if specialist:
-            specialist_prompt = PERSONA_PROMPTS.get(specialist, "")
-            if specialist_prompt:
-                parts.append(
-                    f"### Specialist Knowledge: {specialist}\n{specialist_prompt}"
-                )
+    specialist = classify_specialist(user_msg) if user_msg else None
+    specialist_prompt = PERSONA_PROMPTS.get(specialist, "") if specialist else ""
 
+    closing = ""
     if persona_key == "CHAT":
-        parts.append(CHAT_OUTPUT_CONTRACT)
+        closing = CHAT_OUTPUT_CONTRACT
     elif persona_key == "CODE" and for_cli:
-        parts.append(CLI_CODE_TOOL_GUIDANCE)
+        closing = CLI_CODE_TOOL_GUIDANCE
 
-    return "\n\n".join(parts)
+    return _compose_instruction(
+        date_context, core, base, specialist, specialist_prompt, closing
+    )
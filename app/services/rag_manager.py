@@ -8,6 +8,7 @@ import logging
 import hashlib
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
 from google import genai
 from google.genai import types
@@ -22,6 +23,8 @@ COLLECTION_NAME = "company_codebase"
 # Try 001 first, fallback to 004 if needed.
 EMBEDDING_MODEL_PRIMARY = "gemini-embedding-001"
 EMBEDDING_MODEL_FALLBACK = "text-embedding-004"
+# Embedding batches requested concurrently while indexing
+EMBED_WORKERS = 8
 
 
 class RateLimiter:
@@ -370,18 +373,20 @@ class RAGManager:
         for root, dirs, files in os.walk(CODEBASE_ROOT):
             # Calculate relative path from CODEBASE_ROOT to current 'root'
             # pylint: disable=duplicate-code
+            # Kept as a "/"-terminated prefix so entry paths are a plain
+            # concatenation (gitignore matching uses "/" on every platform)
             rel_root = os.path.relpath(root, CODEBASE_ROOT)
-            if rel_root == ".":
-                rel_root = ""
+            rel_prefix = "" if rel_root == "." else rel_root.replace(os.sep, "/") + "/"
 
             # Filter directories in-place to prevent recursion into ignored ones
             valid_dirs = []
             for d in dirs:
                 # Construct path relative to repo root
-                d_path = os.path.join(rel_root, d)
+                d_path = rel_prefix + d
 
-                # Check explicit ignore list first
-                if d in ignore_dirs:
+                # Check explicit ignore list and bare-name .gitignore entries
+                # first; only other names need a pattern match
+                if d in ignore_dirs or d in spec.ignored_dir_names:
                     continue
 
                 # Check against .gitignore (append slash for directory match)
@@ -401,7 +406,7 @@ class RAGManager:
                 if not file.endswith(valid_extensions):
                     continue
 
-                rel_path = os.path.join(rel_root, file)
+                rel_path = rel_prefix + file
                 if spec.match_file(rel_path):
                     continue
 
@@ -415,29 +420,42 @@ class RAGManager:
         total_chunks = len(pending_data["documents"])
         logger.info("Processing %d chunks in batches of %d", total_chunks, batch_size)
 
-        for i in range(0, total_chunks, batch_size):
-            batch_docs = pending_data["documents"][i : i + batch_size]
-            batch_ids = pending_data["ids"][i : i + batch_size]
-            batch_metas = pending_data["metadatas"][i : i + batch_size]
-
+        def embed_batch(start):
             try:
-                embeddings = self._get_embeddings(batch_docs)
-                if embeddings:
-                    # Check if we got correct number of embeddings
-                    if len(embeddings) != len(batch_docs):
-                        logger.error(
-                            "Mismatch in embeddings count for batch starting at %d", i
-                        )
-                        continue
+                return self._get_embeddings(
+                    pending_data["documents"][start : start + batch_size]
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error embedding batch starting at %d: %s", start, e)
+                return None
+
+        # Embedding requests are network-bound, so several batches are in flight
+        # at once (still paced by the shared rate limiter). Upserts stay on this
+        # thread, in batch order, as the results come back.
+        with ThreadPoolExecutor(
+            max_workers=EMBED_WORKERS, thread_name_prefix="embed"
+        ) as executor:
+            starts = range(0, total_chunks, batch_size)
+            for i, embeddings in zip(starts, executor.map(embed_batch, starts)):
+                if not embeddings:
+                    continue
+                batch_docs = pending_data["documents"][i : i + batch_size]
+                # Check if we got correct number of embeddings
+                if len(embeddings) != len(batch_docs):
+                    logger.error(
+                        "Mismatch in embeddings count for batch starting at %d", i
+                    )
+                    continue
 
+                try:
                     self.collection.upsert(
-                        ids=batch_ids,
+                        ids=pending_data["ids"][i : i + batch_size],
                         embeddings=embeddings,
                         documents=batch_docs,
-                        metadatas=batch_metas,
+                        metadatas=pending_data["metadatas"][i : i + batch_size],
                     )
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Error processing batch starting at %d: %s", i, e)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Error processing batch starting at %d: %s", i, e)
 
         # Process deletions
         total_deletions = len(pending_data["deletions"])
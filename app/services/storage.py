@@ -3,6 +3,7 @@ Shared storage utilities for managing file paths.
 """
 
 import os
+import stat
 
 
 def get_storage_path(env_var_name: str, filename: str) -> str:
@@ -19,12 +20,12 @@ def get_storage_path(env_var_name: str, filename: str) -> str:
 
     # Priority 2: /config directory
     config_dir = "/config"
-    # Check if /config exists, is a directory, and is writable
-    if (
-        os.path.exists(config_dir)
-        and os.path.isdir(config_dir)
-        and os.access(config_dir, os.W_OK)
-    ):
+    # Check if /config exists, is a directory, and is writable (one stat + access)
+    try:
+        config_is_dir = stat.S_ISDIR(os.stat(config_dir).st_mode)
+    except OSError:
+        config_is_dir = False
+    if config_is_dir and os.access(config_dir, os.W_OK):
         return os.path.join(config_dir, filename)
 
     # Fallback: Local file
@@ -4,10 +4,33 @@ Service for fetching and parsing web content.
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+# One session for all fetches, so repeated requests to a host reuse pooled
+# keep-alive connections instead of a new TCP+TLS handshake each time.
+# Only transient gateway statuses are retried; connect and read failures are
+# not, so a dead host still fails within the one timeout. The final response
+# is still returned so raise_for_status reports it as before.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        connect=0,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
 
 def fetch_url(url: str) -> str:
     """
@@ -20,7 +43,7 @@ def fetch_url(url: str) -> str:
         str: The extracted text or an error message.
     """
     try:
-        response = requests.get(url, timeout=10, stream=True)
+        response = _SESSION.get(url, timeout=10, stream=True)
         response.raise_for_status()
 
         content_type = response.headers.get("Content-Type", "").lower()
@@ -70,3 +93,7 @@ def fetch_url(url: str) -> str:
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.error("Unexpected error parsing URL: %s, Exception: %s", url, e)
         return f"Error: Unexpected error processing {url}. Exception: {e}"
+    finally:
+        # Cookies are kept for redirects within a fetch, but never carried over
+        # to the next, unrelated site
+        _SESSION.cookies.clear()
@@ -29,6 +29,91 @@ def global_function():
         assert "def global_function" in outline
 
 
+def test_python_outline_top_level_and_methods():
+    """Test that the outline lists top-level items and direct class methods only."""
+    content = '''"""Module."""
+import os
+
+
+@decorator
+class MyClass(Base):
+    """Doc."""
+
+    attr = 1
+
+    def method_one(self):
+        def nested():
+            pass
+
+    @property
+    async def method_two(self):
+        class Inner:
+            def hidden(self):
+                pass
+
+
+async def global_function():
+    pass
+
+
+if os.name:
+
+    def conditional():
+        pass
+'''
+    outline = git_ops._get_outline_python(content)  # pylint: disable=protected-access
+
+    assert outline == [
+        "Line 6: class MyClass",
+        "  Line 11: def method_one(...)",
+        "  Line 16: def method_two(...)",
+        "Line 22: def global_function(...)",
+    ]
+
+
+def test_python_outline_any_indent_and_strings():
+    """Test that methods are found at any indent and past column-0 string text."""
+    content = 'class A:\n  def one(self):\n    x = """\ncol0 text\n"""\n\n  def two(self):\n    pass\n'
+
+    outline = git_ops._get_outline_python(content)  # pylint: disable=protected-access
+
+    assert outline == [
+        "Line 1: class A",
+        "  Line 2: def one(...)",
+        "  Line 7: def two(...)",
+    ]
+
+
+def test_python_outline_falls_back_on_syntax_error():
+    """Test that a file that doesn't parse still gets an approximate outline."""
+    content = "class A:\n    def ok(self):\n        pass\n\ndef broken(:\n    pass\n"
+
+    outline = git_ops._get_outline_python(content)  # pylint: disable=protected-access
+
+    assert outline[0].startswith("Error parsing Python file:")
+    assert outline[1:] == [
+        "Line 1: class A",
+        "  Line 2: def ok(...)",
+        "Line 5: def broken(...)",
+    ]
+
+
+def test_get_file_outline_cached_per_content():
+    """Test that an unchanged file is not parsed again and edits are picked up."""
+    git_ops._outline_content.cache_clear()  # pylint: disable=protected-access
+    with patch("app.services.git_ops.read_file", return_value="def a():\n    pass\n"):
+        with patch(
+            "app.services.git_ops._get_outline_python",
+            wraps=git_ops._get_outline_python,  # pylint: disable=protected-access
+        ) as outline_python:
+            first = git_ops.get_file_outline("cached.py")
+            assert git_ops.get_file_outline("cached.py") == first
+            assert outline_python.call_count == 1
+
+    with patch("app.services.git_ops.read_file", return_value="def b():\n    pass\n"):
+        assert git_ops.get_file_outline("cached.py") == "Line 1: def b(...)"
+
+
 def test_get_file_outline_kotlin():
     """Test getting outline for Kotlin file."""
     content = """
@@ -66,6 +151,19 @@ class MyComponent extends React.Component {
         assert "class MyComponent" in outline
 
 
+def test_js_outline_line_numbers():
+    """Test that JS outline matches stay on one line and keep their line numbers."""
+    content = "\n\n  export async function load() {}\nexport\nconst split = 1;\n\ttype T = {};"
+
+    outline = git_ops._get_outline_js(content)  # pylint: disable=protected-access
+
+    assert outline == [
+        "Line 3: export async function load",
+        "Line 5: const split",
+        "Line 6: type T",
+    ]
+
+
 def test_read_android_manifest():
     """Test reading Android manifest."""
     content = """
@@ -89,3 +187,50 @@ def test_read_android_manifest():
         assert ".MainActivity [ENTRY POINT]" in info
         assert ".DetailActivity" in info
         assert ".DetailActivity [ENTRY POINT]" not in info
+
+
+def test_read_android_manifest_only_direct_children():
+    """Test that only manifest-level permissions and application activities count."""
+    content = """<?xml version="1.0" encoding="utf-8"?>
+<manifest xmlns:android="http://schemas.android.com/apk/res/android" package="com.example">
+    <uses-permission android:name="android.permission.CAMERA" />
+    <application>
+        <activity android:name=".Split">
+            <intent-filter>
+                <action android:name="android.intent.action.MAIN" />
+            </intent-filter>
+            <intent-filter>
+                <category android:name="android.intent.category.LAUNCHER" />
+            </intent-filter>
+        </activity>
+        <activity android:name=".Launcher">
+            <intent-filter>
+                <category android:name="android.intent.category.LAUNCHER" />
+                <action android:name="android.intent.action.MAIN" />
+            </intent-filter>
+        </activity>
+        <uses-permission android:name="android.permission.NESTED" />
+    </application>
+</manifest>
+"""
+    with patch("app.services.git_ops.read_file", return_value=content):
+        info = git_ops.read_android_manifest()
+
+    assert info == (
+        "Package: com.example\n"
+        "\nPermissions:\n"
+        "- android.permission.CAMERA\n"
+        "\nActivities:\n"
+        "- .Split\n"
+        "- .Launcher [ENTRY POINT]"
+    )
+
+
+def test_read_android_manifest_parse_error():
+    """Test that malformed XML is reported rather than raised."""
+    with patch(
+        "app.services.git_ops.read_file", return_value="<manifest><a></manifest>"
+    ):
+        info = git_ops.read_android_manifest()
+
+    assert info.startswith("Error parsing AndroidManifest.xml:")
@@ -27,41 +27,20 @@ def fixture_mock_check_output(mocker):
     return mocker.patch("app.services.git_ops.subprocess.check_output")
 
 
-def test_list_files(mocker):
+def test_list_files(tmp_path, mocker):
     """Test the list_files function."""
     # Mock CODEBASE_ROOT
-    mock_codebase = "/mock/codebase"
-    mocker.patch("app.services.git_ops.CODEBASE_ROOT", mock_codebase)
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    git_ops.clear_file_parse_cache()
 
-    # Mock os.path.exists
-    original_exists = os.path.exists
-
-    def mock_exists(path):
-        if path.startswith(mock_codebase):
-            return True
-        return original_exists(path)
-
-    mocker.patch("os.path.exists", side_effect=mock_exists)
-
-    # Mock os.walk
-    def mock_walk(path):
-        # Normalize path to match mock expectation (remove trailing /.)
-        norm_path = os.path.normpath(path)
-        if norm_path == mock_codebase:
-            # root, dirs, files
-            dirs = ["src", ".git"]
-            files = ["readme.md"]
-            yield (mock_codebase, dirs, files)
-
-            # Simulate os.walk recursion based on modified dirs
-            if "src" in dirs:
-                yield (os.path.join(mock_codebase, "src"), [], ["main.py"])
-            if ".git" in dirs:
-                yield (os.path.join(mock_codebase, ".git"), [], ["config"])
-
-    mocker.patch("os.walk", side_effect=mock_walk)
+    (tmp_path / "readme.md").write_text("# readme", encoding="utf-8")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hi')", encoding="utf-8")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "config").write_text("[core]", encoding="utf-8")
 
     files = git_ops.list_files(".")
+    git_ops.clear_file_parse_cache()
 
     # Should ignore .git
     assert "readme.md" in files
@@ -72,20 +51,31 @@ def test_list_files(mocker):
     assert len(git_files) == 0
 
 
-def test_git_status(client, mock_check_output, mocker):
+def test_git_status(client, mock_check_output, mocker, tmp_path):
     """Test the /api/status endpoint."""
     # Ensure caches are cleared so we don't get stale data
-    git_ops._get_remote_url.cache_clear()
+    git_ops.clear_file_parse_cache()
+    git_ops.clear_repo_info_cache()
 
-    # Mock CODEBASE_ROOT to non-existent path so _get_remote_url
-    # fails file lookup and falls back to subprocess
-    mocker.patch("app.services.git_ops.CODEBASE_ROOT", "/non/existent/path")
+    # Point CODEBASE_ROOT at a repo with an empty .git so the file lookups
+    # fail and both values come from git processes
+    (tmp_path / ".git").mkdir()
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
 
     # Mock get-url and branch
-    mock_check_output.side_effect = [
-        b"https://github.com/user/repo.git\n",  # remote url
-        b"main\n",  # branch
-    ]
+    outputs = {
+        "remote": b"https://github.com/user/repo.git\n",
+        "rev-parse": b"main\n",
+    }
+
+    def fake_popen(args, **_kwargs):
+        proc = MagicMock(args=args, returncode=0)
+        proc.communicate.return_value = (outputs[args[1]], None)
+        return proc
+
+    mock_popen = mocker.patch(
+        "app.services.git_ops.subprocess.Popen", side_effect=fake_popen
+    )
 
     response = client.get("/api/status")
     data = response.json()
@@ -93,6 +83,24 @@ def test_git_status(client, mock_check_output, mocker):
     assert response.status_code == 200
     assert data["project"] == "user/repo"
     assert data["branch"] == "main"
+    # One git process per value, started without blocking on check_output
+    assert mock_popen.call_count == 2
+    mock_check_output.assert_not_called()
+    git_ops.clear_repo_info_cache()
+
+
+def test_git_status_without_repo(client, mocker, tmp_path):
+    """Test that /api/status doesn't run git when there is no repository."""
+    git_ops.clear_repo_info_cache()
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    mock_popen = mocker.patch("app.services.git_ops.subprocess.Popen")
+
+    data = client.get("/api/status").json()
+
+    assert data["project"] == "Unknown"
+    assert data["branch"] == "main"
+    mock_popen.assert_not_called()
+    git_ops.clear_repo_info_cache()
 
 
 def test_git_pull_success(client, mock_run):
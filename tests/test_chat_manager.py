@@ -116,3 +116,62 @@ def test_load_history_complex_parts(clean_db, mocker):
     assert len(history) == 1
     assert history[0]["role"] == "user"
     mock_logger.warning.assert_called()
+
+
+def test_load_history_served_from_cache(clean_db, mocker):
+    """
+    Test that repeated loads of an unchanged database skip the query.
+    """
+    insert_message(clean_db, "user", [{"text": "Hello"}])
+
+    first = chat_manager.load_chat_history()
+    spy = mocker.spy(clean_db, "fetch_all")
+    second = chat_manager.load_chat_history()
+
+    assert first == second
+    spy.assert_not_called()
+
+
+def test_load_history_cache_invalidated_on_save(clean_db):
+    """
+    Test that save_message and reset_history invalidate the cached history.
+    """
+    insert_message(clean_db, "user", [{"text": "Hello"}])
+    assert len(chat_manager.load_chat_history()) == 1
+
+    chat_manager.save_message("model", "Hi there")
+    history = chat_manager.load_chat_history()
+    assert len(history) == 2
+    assert history[-1]["parts"][0]["text"] == "Hi there"
+
+    chat_manager.reset_history()
+    assert not chat_manager.load_chat_history()
+
+
+def test_history_page_uses_created_at_index(clean_db):
+    """
+    Test that paged history reads walk the created_at index instead of sorting.
+    """
+    with clean_db.get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM messages "
+            "ORDER BY created_at DESC LIMIT 20 OFFSET 0"
+        ).fetchall()
+
+    details = " ".join(row["detail"] for row in plan)
+    assert "idx_messages_created_at" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_history_page_total_tracks_saves(clean_db):
+    """
+    Test that the cached total is refreshed when messages are saved.
+    """
+    assert chat_manager.get_history_page()["total"] == 0
+    chat_manager.save_message("user", "Hello")
+    chat_manager.save_message("model", "Hi")
+
+    page = chat_manager.get_history_page(limit=1)
+    assert page["total"] == 2
+    assert page["has_more"] is True
+    assert page["messages"][0]["parts"][0]["text"] == "Hi"
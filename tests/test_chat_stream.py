@@ -2,9 +2,11 @@
 Tests for the chat streaming functionality.
 """
 
+import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 from google.genai import types
 from tests.utils import AsyncIterator
+from app.services.llm_service import stream_generator
 
 
 def test_chat_get_stream_basic(client):
@@ -112,3 +114,15 @@ def test_chat_tool_execution(client):
 
             # Check for done
             assert "event: done" in data
+
+
+def test_stream_generator_coalesces_queued_events():
+    """Test that events already queued are sent as one chunk, stopping at None."""
+
+    async def collect():
+        queue = asyncio.Queue()
+        for event in ["event: a\n\n", "event: b\n\n", None, "event: late\n\n"]:
+            queue.put_nowait(event)
+        return [chunk async for chunk in stream_generator(queue)]
+
+    assert asyncio.run(collect()) == ["event: a\n\nevent: b\n\n"]
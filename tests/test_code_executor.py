@@ -0,0 +1,42 @@
+"""
+Tests for the code executor service.
+"""
+
+from app.services import code_executor
+
+
+def test_execute_code_subprocess_default():
+    """Test that code runs in a subprocess by default."""
+    result = code_executor.execute_code("print('hello')")
+    assert result == "Output:\nhello"
+
+
+def test_execute_code_subprocess_reports_traceback():
+    """Test that errors in subprocess mode report a traceback from the snippet."""
+    result = code_executor.execute_code("print('before')\nraise ValueError('boom')")
+
+    assert result.startswith("Output:\nbefore")
+    assert 'File "<string>", line 2' in result
+    assert "ValueError: boom" in result
+    # The worker bootstrap frame is not part of the traceback
+    assert "line 1" not in result
+
+
+def test_execute_code_subprocess_uses_warm_worker(mocker):
+    """Test that a pre-started worker is used and the pool is refilled."""
+    code_executor.execute_code("pass")
+    assert code_executor._WARM_WORKERS  # pylint: disable=protected-access
+
+    spawn = mocker.spy(code_executor, "_spawn_worker")
+    assert code_executor.execute_code("print(1 + 1)") == "Output:\n2"
+    # Only the replacement spare was spawned; the snippet ran on a warm worker
+    assert spawn.call_count == 1
+
+
+def test_execute_code_subprocess_timeout(mocker):
+    """Test that subprocess mode kills code that exceeds the time limit."""
+    mocker.patch("app.services.code_executor.CODE_EXEC_TIMEOUT", 0.5)
+
+    result = code_executor.execute_code("while True:\n    pass")
+
+    assert "timed out" in result
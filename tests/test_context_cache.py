@@ -0,0 +1,67 @@
+"""
+Tests for context cache reuse in get_cached_content_config.
+"""
+
+from unittest.mock import MagicMock
+
+from app.services import llm_service
+
+
+def _history(*texts):
+    return [
+        {"role": "user" if i % 2 == 0 else "model", "parts": [{"text": text}]}
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_cache_reused_only_for_matching_prefix(tmp_path, monkeypatch):
+    """Test that a cache is reused while the history extends the cached prefix."""
+    monkeypatch.chdir(tmp_path)
+    llm_service.clear_cache()
+    client = MagicMock()
+    client.caches.create.return_value = MagicMock()
+    client.caches.create.return_value.name = "caches/1"
+    big = "x" * 100000
+
+    name, delta = llm_service.get_cached_content_config(
+        client, _history(big, "a"), "sys", "model"
+    )
+    assert (name, delta) == ("caches/1", [])
+
+    name, delta = llm_service.get_cached_content_config(
+        client, _history(big, "a", "b"), "sys", "model"
+    )
+    assert name == "caches/1"
+    assert delta == _history(big, "a", "b")[2:]
+    assert client.caches.create.call_count == 1
+
+    # An edited earlier message means the cached prefix no longer applies
+    client.caches.create.return_value.name = "caches/2"
+    name, delta = llm_service.get_cached_content_config(
+        client, _history(big, "changed", "b"), "sys", "model"
+    )
+    assert (name, delta) == ("caches/2", [])
+    assert client.caches.create.call_count == 2
+    llm_service.clear_cache()
+
+
+def test_small_history_is_not_cached(tmp_path, monkeypatch):
+    """Test that histories under the size threshold skip cache creation."""
+    monkeypatch.chdir(tmp_path)
+    llm_service.clear_cache()
+    client = MagicMock()
+    history = _history(*(["y" * 1000] * 50))
+
+    assert llm_service.get_cached_content_config(client, history, "sys", "model") == (
+        None,
+        history,
+    )
+    client.caches.create.assert_not_called()
+
+
+def test_approx_char_count_stops_at_limit():
+    """Test that size estimation counts text parts and stops early."""
+    history = _history("abc", "de") + [{"role": "user", "parts": ["zz"]}]
+    # pylint: disable=protected-access
+    assert llm_service._approx_char_count("s", history, 100) == 1 + 3 + 2 + 2
+    assert llm_service._approx_char_count("s", history, 4) == 4
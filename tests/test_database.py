@@ -2,16 +2,20 @@
 Tests for database initialization.
 """
 
+import io
+import json
 import os
 import sys
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 
 # Ensure we can import app from the root
 sys.path.append(os.getcwd())
 
-# pylint: disable=wrong-import-position
-from app.services.database import DatabaseManager
+# pylint: disable=wrong-import-position, protected-access
+from app.services import database
+from app.services.database import DatabaseManager, _iter_json_array
 
 
 def test_init_db_creates_tables(tmp_path):
@@ -104,3 +108,264 @@ def test_init_db_idempotency(tmp_path):
         assert "tasks" in tables
         assert "messages" in tables
         assert "settings" in tables
+
+
+def test_get_connection_enables_mmap(tmp_path):
+    """
+    Test that connections are opened with memory-mapped I/O enabled.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_mmap.db"))
+
+    with db.get_connection() as conn:
+        mmap_size = conn.execute("PRAGMA mmap_size").fetchone()[0]
+
+    assert mmap_size > 0
+
+
+def test_execute_query_concurrent_writers(tmp_path):
+    """
+    Test that concurrent writers from multiple threads all succeed.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_concurrent.db"))
+    db.init_db()
+
+    def write(i):
+        db.execute_query(
+            "INSERT INTO settings (key, value) VALUES (?, ?)", (f"k{i}", str(i))
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(50)))
+
+    assert db.fetch_one("SELECT COUNT(*) as count FROM settings")["count"] == 50
+
+
+def test_queue_write_batches_into_one_flush(tmp_path):
+    """
+    Test that queued writes are committed together and visible to reads.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_queue.db"))
+    db.init_db()
+
+    for i in range(10):
+        db.queue_write(
+            "INSERT INTO settings (key, value) VALUES (?, ?)", (f"k{i}", str(i))
+        )
+    generation = db.write_generation
+
+    # Reads flush the queue first
+    assert db.fetch_one("SELECT COUNT(*) as count FROM settings")["count"] == 10
+    assert db.write_generation == generation + 1
+    assert db.flush() == 0
+
+
+def test_execute_query_flushes_queued_writes_first(tmp_path):
+    """
+    Test that a synchronous write is ordered after pending queued writes.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_queue_order.db"))
+    db.init_db()
+
+    db.queue_write("INSERT INTO settings (key, value) VALUES (?, ?)", ("k", "old"))
+    db.execute_query("UPDATE settings SET value = ? WHERE key = ?", ("new", "k"))
+
+    assert db.fetch_one("SELECT value FROM settings WHERE key = 'k'")["value"] == "new"
+
+
+def test_migrate_from_json(tmp_path, monkeypatch):
+    """
+    Test that legacy JSON tasks and chat history are imported and backed up.
+    """
+    tasks_file = tmp_path / "tasks.json"
+    chat_file = tmp_path / "chat_history.json"
+    tasks_file.write_text(
+        json.dumps([{"id": "t1", "status": "done", "extra": 1}]), encoding="utf-8"
+    )
+    chat_file.write_text(
+        json.dumps(
+            [
+                {"role": "user", "parts": [{"text": "Hi"}]},
+                {"role": "model", "parts": [{"text": "Hello"}]},
+                {"role": "model", "parts": [{"function_call": {"name": "x"}}]},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("JULES_TASKS_FILE", str(tasks_file))
+    monkeypatch.setenv("CHAT_HISTORY_FILE", str(chat_file))
+
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_migrate.db"))
+    db.init_db()
+    db.migrate_from_json()
+
+    task = db.fetch_one("SELECT * FROM tasks")
+    assert task["id"] == "t1"
+    assert json.loads(task["data"]) == {"extra": 1}
+    messages = db.fetch_all("SELECT content FROM messages")
+    # The dangling function call is dropped
+    assert sorted(m["content"] for m in messages) == ["Hello", "Hi"]
+    assert (tmp_path / "tasks.json.bak").exists()
+    assert (tmp_path / "chat_history.json.bak").exists()
+
+
+def test_iter_json_array_small_chunks():
+    """
+    Test that the streaming array reader handles items split across chunks.
+    """
+    items = [{"text": "a, [b] {c}"}, 12345, "x", [1, [2]], None, 1.5]
+    text = json.dumps(items, indent=2)
+
+    for chunk_size in (1, 3, 7, len(text)):
+        assert list(_iter_json_array(io.StringIO(text), chunk_size)) == items
+    assert not list(_iter_json_array(io.StringIO(" [ ] ")))
+
+
+def test_iter_json_array_large_item_reads_grow(mocker):
+    """
+    Test that an item spanning many chunks is not re-parsed once per chunk.
+    """
+    items = [{"data": "x" * 100_000}, 1]
+    decode = mocker.spy(database._JSON_DECODER, "raw_decode")
+
+    assert list(_iter_json_array(io.StringIO(json.dumps(items)), 16)) == items
+    # Reads double while the big item is incomplete: ~log2(100000 / 16) tries
+    assert decode.call_count < 20
+
+
+def test_migrate_chat_history_malformed_rolls_back(tmp_path, monkeypatch):
+    """
+    Test that a malformed legacy history imports nothing and is left in place.
+    """
+    chat_file = tmp_path / "chat_history.json"
+    messages = [{"role": "user", "parts": [{"text": str(i)}]} for i in range(5)]
+    chat_file.write_text(json.dumps(messages)[:-1] + ", {oops", encoding="utf-8")
+    monkeypatch.setenv("JULES_TASKS_FILE", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("CHAT_HISTORY_FILE", str(chat_file))
+    monkeypatch.setattr(database, "MIGRATION_BATCH_SIZE", 2)
+
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_migrate_bad.db"))
+    db.init_db()
+    db.migrate_from_json()
+
+    assert db.fetch_one("SELECT COUNT(*) as count FROM messages")["count"] == 0
+    assert chat_file.exists()
+
+
+def test_flush_requeues_writes_on_transient_error(tmp_path, monkeypatch):
+    """
+    Test that a locked database fails the flush and keeps the writes queued.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_retry.db"))
+    db.init_db()
+    db.queue_write("INSERT INTO settings (key, value) VALUES (?, ?)", ("a", "1"))
+
+    busy = sqlite3.OperationalError("database is locked")
+    busy.sqlite_errorcode = 5
+    real_connect = sqlite3.connect
+    calls = []
+
+    def flaky_connect(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise busy
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(database.sqlite3, "connect", flaky_connect)
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+
+    db.queue_write("INSERT INTO settings (key, value) VALUES (?, ?)", ("b", "2"))
+    assert db.flush() == 2
+    rows = db.fetch_all("SELECT key FROM settings ORDER BY key")
+    assert [row["key"] for row in rows] == ["a", "b"]
+
+
+def test_background_flush_error_reaches_next_writer(tmp_path):
+    """
+    Test that one bad queued write drops only itself and is reported to the
+    next write-side flush, not to reads.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_dropped.db"))
+    db.init_db()
+
+    insert = "INSERT INTO settings (key, value) VALUES (?, ?)"
+    db.queue_write(insert, ("a", "1"))
+    db.queue_write(insert, ("a", "duplicate"))
+    db.queue_write(insert, ("b", "2"))
+    flusher = db._flusher  # pylint: disable=protected-access
+    if flusher is not None:
+        flusher.join()
+
+    # The other writes in the batch survive and reads don't fail
+    rows = db.fetch_all("SELECT key, value FROM settings ORDER BY key")
+    assert [(row["key"], row["value"]) for row in rows] == [("a", "1"), ("b", "2")]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db.flush()
+    # Reported once; later calls work again
+    assert db.flush() == 0
+
+
+def test_flush_replays_batch_on_bad_write(tmp_path):
+    """
+    Test that a write-side flush keeps the good writes and raises for the bad one.
+    """
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_replay.db"))
+    db.init_db()
+
+    db.queue_write("INSERT INTO settings (key, value) VALUES (?, ?)", ("a", "1"))
+    db.queue_write("INSERT INTO missing_table VALUES (?)", (1,))
+    db.queue_write("INSERT INTO settings (key, value) VALUES (?, ?)", ("b", "2"))
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    assert db.fetch_one("SELECT COUNT(*) as count FROM settings")["count"] == 2
+    assert db.flush() == 0
+
+
+def test_migrate_keeps_legacy_files_until_committed(tmp_path, monkeypatch):
+    """
+    Test that legacy files are only renamed after the migration commits.
+    """
+    chat_file = tmp_path / "chat_history.json"
+    chat_file.write_text(
+        json.dumps([{"role": "user", "parts": [{"text": "Hi"}]}]), encoding="utf-8"
+    )
+    monkeypatch.setenv("JULES_TASKS_FILE", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("CHAT_HISTORY_FILE", str(chat_file))
+
+    DatabaseManager.reset_instance()
+    db = DatabaseManager(db_url=str(tmp_path / "test_migrate_commit.db"))
+    db.init_db()
+
+    class FailingCommit(sqlite3.Connection):
+        """Connection whose commit fails, as on a crash mid-migration."""
+
+        def commit(self):
+            raise sqlite3.OperationalError("disk I/O error")
+
+    real_connect = sqlite3.connect
+    monkeypatch.setattr(
+        database.sqlite3,
+        "connect",
+        lambda path: real_connect(path, factory=FailingCommit),
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        db.migrate_from_json()
+    monkeypatch.setattr(database.sqlite3, "connect", real_connect)
+
+    assert chat_file.exists()
+    assert db.fetch_all("SELECT * FROM messages") == []
+
+    db.migrate_from_json()
+    assert not chat_file.exists()
+    assert db.fetch_one("SELECT content FROM messages")["content"] == "Hi"
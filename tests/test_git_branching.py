@@ -1,5 +1,6 @@
 """Tests for Git branching operations."""
 
+import subprocess
 from unittest.mock import patch, MagicMock
 import pytest
 from app.services import git_ops
@@ -67,3 +68,162 @@ async def test_api_switch_branch():
         request = system.BranchSwitchRequest(branch_name="dev")
         response = await system.api_switch_branch(request)
         assert response == {"success": True, "output": "ok"}
+
+
+def test_get_current_branch_reads_head(tmp_path, mocker):
+    """Test that the branch is read from .git/HEAD without forking git."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text(
+        "ref: refs/heads/feature/x\n", encoding="utf-8"
+    )
+    mock_check_output = mocker.patch("app.services.git_ops.subprocess.check_output")
+
+    assert git_ops.get_current_branch() == "feature/x"
+    mock_check_output.assert_not_called()
+
+
+def test_get_current_branch_follows_gitfile(tmp_path, mocker):
+    """Test that a worktree's .git file is followed to its HEAD."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    worktree_git = tmp_path / "main-repo" / ".git" / "worktrees" / "wt"
+    worktree_git.mkdir(parents=True)
+    (worktree_git / "HEAD").write_text("ref: refs/heads/wt-branch\n", encoding="utf-8")
+    (tmp_path / ".git").write_text(
+        "gitdir: main-repo/.git/worktrees/wt\n", encoding="utf-8"
+    )
+    mock_check_output = mocker.patch("app.services.git_ops.subprocess.check_output")
+
+    assert git_ops.get_current_branch() == "wt-branch"
+    mock_check_output.assert_not_called()
+
+
+def test_get_repo_info_cached_until_cleared(mocker):
+    """Test that get_repo_info reuses its result until the cache is cleared."""
+    git_ops.clear_repo_info_cache()
+    mocker.patch("app.services.git_ops._in_git_repo", return_value=True)
+    mocker.patch(
+        "app.services.git_ops._config_remote_url",
+        return_value="https://github.com/user/repo.git",
+    )
+    mock_branch = mocker.patch(
+        "app.services.git_ops._read_head_branch", return_value="main"
+    )
+
+    assert git_ops.get_repo_info()["project"] == "user/repo"
+    assert git_ops.get_repo_info()["branch"] == "main"
+    assert mock_branch.call_count == 1
+
+    git_ops.clear_repo_info_cache()
+    git_ops.get_repo_info()
+    assert mock_branch.call_count == 2
+    git_ops.clear_repo_info_cache()
+
+
+def test_get_branches_reads_refs(tmp_path, mocker):
+    """Test that branches are read from loose and packed refs without forking git."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    heads = tmp_path / ".git" / "refs" / "heads"
+    (heads / "feature").mkdir(parents=True)
+    (heads / "main").write_text("abc\n", encoding="utf-8")
+    (heads / "feature" / "x").write_text("def\n", encoding="utf-8")
+    (tmp_path / ".git" / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted\n"
+        "123 refs/heads/dev\n"
+        "456 refs/tags/v1\n"
+        "^789\n",
+        encoding="utf-8",
+    )
+    mock_run = mocker.patch("app.services.git_ops.subprocess.run")
+
+    assert git_ops.get_branches() == ["dev", "feature/x", "main"]
+    mock_run.assert_not_called()
+
+
+def test_head_sha_resolves_loose_and_packed_refs(tmp_path, mocker):
+    """Test that HEAD is resolved through loose refs, then packed-refs."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    (tmp_path / ".git" / "refs" / "heads").mkdir(parents=True)
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/dev\n", encoding="utf-8")
+    (tmp_path / ".git" / "packed-refs").write_text(
+        "# pack-refs with: peeled\n123 refs/heads/dev\n", encoding="utf-8"
+    )
+    assert git_ops._head_sha() == "123"  # pylint: disable=protected-access
+
+    (tmp_path / ".git" / "refs" / "heads" / "dev").write_text("456\n", encoding="utf-8")
+    assert git_ops._head_sha() == "456"  # pylint: disable=protected-access
+
+
+def test_recent_commits_cached_until_head_moves(tmp_path, mocker):
+    """Test that git log output is reused until a new commit moves HEAD."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(
+        [*git, "commit", "-q", "--allow-empty", "-m", "first"], cwd=tmp_path, check=True
+    )
+    run = mocker.spy(git_ops.subprocess, "run")
+
+    first = git_ops.get_recent_commits(max_count=5)
+    assert "first" in first
+    assert git_ops.get_recent_commits(max_count=5) == first
+    assert run.call_count == 1
+
+    subprocess.run(
+        [*git, "commit", "-q", "--allow-empty", "-m", "second"],
+        cwd=tmp_path,
+        check=True,
+    )
+    assert "second" in git_ops.get_recent_commits(max_count=5)
+
+
+def test_repo_info_in_worktree_reads_shared_git_dir(tmp_path, mocker):
+    """Test that a linked worktree's remote, branch and refs come from files."""
+    main = tmp_path / "main"
+    main.mkdir()
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", "-b", "main"], cwd=main, check=True)
+    subprocess.run(
+        ["git", "remote", "add", "origin", "https://github.com/user/wt-repo.git"],
+        cwd=main,
+        check=True,
+    )
+    subprocess.run(
+        [*git, "commit", "-q", "--allow-empty", "-m", "c"], cwd=main, check=True
+    )
+    subprocess.run(
+        ["git", "worktree", "add", "-q", "-b", "wt", str(tmp_path / "wt")],
+        cwd=main,
+        check=True,
+    )
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path / "wt"))
+    git_ops.clear_repo_info_cache()
+    mock_popen = mocker.patch("app.services.git_ops.subprocess.Popen")
+    mock_run = mocker.patch("app.services.git_ops.subprocess.run")
+
+    info = git_ops.get_repo_info()
+
+    assert info["project"] == "user/wt-repo"
+    assert info["branch"] == "wt"
+    assert git_ops.get_branches() == ["main", "wt"]
+    mock_popen.assert_not_called()
+    mock_run.assert_not_called()
+    git_ops.clear_repo_info_cache()
+
+
+@pytest.mark.parametrize("push_fails", [False, True])
+def test_git_push_clears_repo_info_cache(
+    mock_subprocess_run, mocker, push_fails
+):  # pylint: disable=redefined-outer-name
+    """Test that the cached branch is dropped after a push, even a failed one."""
+    mocker.patch("app.services.git_ops.get_current_branch", return_value="main")
+    if push_fails:
+        mock_subprocess_run.side_effect = subprocess.CalledProcessError(
+            1, "git", stderr="rejected"
+        )
+    mock_clear = mocker.patch("app.services.git_ops.clear_repo_info_cache")
+
+    result = git_ops.perform_git_push("feature", "msg", switch_back=False)
+
+    assert result["success"] is not push_fails
+    mock_clear.assert_called_once()
@@ -6,7 +6,6 @@ Tests for git config parsing.
 
 import os
 import sys
-from unittest.mock import mock_open
 import pytest
 
 # Ensure we can import app from the root
@@ -17,15 +16,21 @@ from app.services import git_ops  # pylint: disable=wrong-import-position
 
 @pytest.fixture(autouse=True)
 def clear_cache():
-    """Clear the lru_cache of _get_remote_url before and after each test."""
-    git_ops._get_remote_url.cache_clear()
+    """Clear the cached .git/config parse before and after each test."""
+    git_ops.clear_file_parse_cache()
     yield
-    git_ops._get_remote_url.cache_clear()
+    git_ops.clear_file_parse_cache()
 
 
-def test_get_remote_url_with_quotes(mocker):
+def _write_config(root, content):
+    """Writes content as root/.git/config."""
+    (root / ".git").mkdir()
+    (root / ".git" / "config").write_text(content, encoding="utf-8")
+
+
+def test_get_remote_url_with_quotes(tmp_path, mocker):
     """Test parsing .git/config with quoted URL."""
-    mocker.patch("app.services.git_ops.CODEBASE_ROOT", "/mock")
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
 
     config_content = """
 [core]
@@ -35,34 +40,32 @@ def test_get_remote_url_with_quotes(mocker):
     fetch = +refs/heads/*:refs/remotes/origin/*
 """
 
-    mocker.patch("os.path.exists", return_value=True)
-    mocker.patch("builtins.open", mock_open(read_data=config_content))
+    _write_config(tmp_path, config_content)
     mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
 
     url = git_ops._get_remote_url()
     assert url == "https://github.com/user/quoted-repo.git"
 
 
-def test_get_remote_url_simple(mocker):
+def test_get_remote_url_simple(tmp_path, mocker):
     """Test parsing .git/config with simple URL."""
-    mocker.patch("app.services.git_ops.CODEBASE_ROOT", "/mock")
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
 
     config_content = """
 [remote "origin"]
     url = https://github.com/user/simple-repo.git
 """
 
-    mocker.patch("os.path.exists", return_value=True)
-    mocker.patch("builtins.open", mock_open(read_data=config_content))
+    _write_config(tmp_path, config_content)
     mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
 
     url = git_ops._get_remote_url()
     assert url == "https://github.com/user/simple-repo.git"
 
 
-def test_get_remote_url_fallback(mocker):
+def test_get_remote_url_fallback(tmp_path, mocker):
     """Test fallback to subprocess if config parsing fails."""
-    mocker.patch("app.services.git_ops.CODEBASE_ROOT", "/mock")
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
 
     # Config exists but no remote origin
     config_content = """
@@ -70,8 +73,7 @@ def test_get_remote_url_fallback(mocker):
     repositoryformatversion = 0
 """
 
-    mocker.patch("os.path.exists", return_value=True)
-    mocker.patch("builtins.open", mock_open(read_data=config_content))
+    _write_config(tmp_path, config_content)
 
     # Mock subprocess to return a URL
     mock_subprocess = mocker.patch(
@@ -82,3 +84,80 @@ def test_get_remote_url_fallback(mocker):
     url = git_ops._get_remote_url()
     assert url == "https://github.com/user/fallback.git"
     mock_subprocess.assert_called_once()
+
+
+def test_get_remote_url_git_style_config(tmp_path, mocker):
+    """Test parsing a tab-indented config with repeated and bare keys."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+
+    config_content = """
+[core]
+\tbare = false
+\tsymlinks
+[remote "upstream"]
+\turl = https://github.com/other/upstream.git
+[remote "origin"]
+\turl = https://github.com/user/repo%20name.git
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+\tfetch = +refs/pull/*:refs/remotes/origin/pr/*
+[branch "main"]
+\tremote = origin
+"""
+
+    _write_config(tmp_path, config_content)
+    mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
+
+    url = git_ops._get_remote_url()
+    assert url == "https://github.com/user/repo%20name.git"
+
+
+def test_get_remote_url_reparses_changed_config(tmp_path, mocker):
+    """Test that the config parse is cached until the file changes."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
+    _write_config(tmp_path, '[remote "origin"]\n\turl = https://github.com/a/one.git\n')
+    parse = mocker.spy(git_ops, "_parse_origin_url")
+
+    assert git_ops._get_remote_url() == "https://github.com/a/one.git"
+    assert git_ops._get_remote_url() == "https://github.com/a/one.git"
+    assert parse.call_count == 1
+
+    (tmp_path / ".git" / "config").write_text(
+        '[remote "origin"]\n\turl = https://github.com/a/second.git\n',
+        encoding="utf-8",
+    )
+    assert git_ops._get_remote_url() == "https://github.com/a/second.git"
+    assert parse.call_count == 2
+
+
+def test_get_remote_url_comments_and_key_case(tmp_path, mocker):
+    """Test that comments are skipped and key names are case-insensitive."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
+
+    config_content = """
+# [remote "origin"]
+[remote "origin"]
+\t; url = https://github.com/user/commented.git
+\tURL = git@github.com:user/repo.git # primary
+\turl = https://github.com/user/second-url.git
+"""
+    _write_config(tmp_path, config_content)
+
+    url = git_ops._get_remote_url()
+    assert url == "git@github.com:user/repo.git"
+
+
+@pytest.mark.parametrize(
+    "header", ['[Remote "origin"]', "[remote.origin]", '[remote  "origin" ]']
+)
+def test_get_remote_url_section_header_forms(tmp_path, mocker, header):
+    """Test that origin section headers are recognized in every form git accepts."""
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
+    mocker.patch("subprocess.check_output", side_effect=FileNotFoundError)
+    _write_config(
+        tmp_path,
+        f'[remote "origin2"]\n\turl = wrong\n{header}\n\turl = https://github.com/a/b.git\n',
+    )
+
+    assert git_ops._get_remote_url() == "https://github.com/a/b.git"
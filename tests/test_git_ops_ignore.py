@@ -4,6 +4,7 @@ Tests for git operations respecting .gitignore.
 
 # pylint: disable=protected-access, redefined-outer-name, unused-import
 
+import subprocess
 import pytest
 from app.services import git_ops
 
@@ -12,9 +13,9 @@ from app.services import git_ops
 def temp_codebase(tmp_path, mocker):
     """Sets up a temporary codebase root with .gitignore."""
     mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(tmp_path))
-    git_ops.load_gitignore_spec.cache_clear()
+    git_ops.clear_file_parse_cache()
     yield tmp_path
-    git_ops.load_gitignore_spec.cache_clear()
+    git_ops.clear_file_parse_cache()
 
 
 def test_list_files_respects_gitignore(temp_codebase):
@@ -100,9 +101,7 @@ def test_list_files_nested_ignore(temp_codebase):
     # "temp/" ignores "src/temp/"
     assert "src/temp/data.tmp" not in files
 
-    # Clear cache because we modified .gitignore
-    git_ops.load_gitignore_spec.cache_clear()
-
+    # The cached parse is dropped because .gitignore changed on disk
     # Case 2: "/temp/" should ONLY ignore root temp
     (temp_codebase / ".gitignore").write_text("/temp/", encoding="utf-8")
 
@@ -121,3 +120,195 @@ def test_list_files_nested_ignore(temp_codebase):
 
     assert "temp/root.tmp" not in files
     assert "src/temp/data.tmp" in files
+
+
+def test_list_files_pagination(temp_codebase):
+    """Test that offset and limit page through the listing."""
+    (temp_codebase / "pages").mkdir()
+    for i in range(5):
+        (temp_codebase / "pages" / f"file{i}.txt").write_text("x", encoding="utf-8")
+
+    all_files = git_ops.list_files("pages", limit=None)
+    assert len(all_files) == 5
+
+    first_page = git_ops.list_files("pages", offset=0, limit=2)
+    assert first_page[:2] == all_files[:2]
+    assert "Use offset=2 to list more" in first_page[2]
+
+    last_page = git_ops.list_files("pages", offset=4, limit=2)
+    assert last_page == all_files[4:]
+
+
+def test_list_files_missing_directory(temp_codebase):
+    """Test that a missing directory is reported rather than listed as empty."""
+    (temp_codebase / "empty").mkdir()
+
+    assert git_ops.list_files("empty") == []
+    assert git_ops.list_files("missing") == ["Error: Directory missing does not exist."]
+
+
+def test_list_files_walk_order_is_depth_first(temp_codebase):
+    """Test that the concurrent walk still yields a directory's files before its subtrees."""
+    root = temp_codebase / "tree"
+    for rel in ["a.txt", "sub1/b.txt", "sub1/deep/c.txt", "sub2/d.txt"]:
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text("x", encoding="utf-8")
+
+    files = git_ops.list_files("tree", limit=None)
+
+    assert files[0] == "tree/a.txt"
+    assert sorted(files) == [
+        "tree/a.txt",
+        "tree/sub1/b.txt",
+        "tree/sub1/deep/c.txt",
+        "tree/sub2/d.txt",
+    ]
+    sub1 = [f for f in files if f.startswith("tree/sub1/")]
+    # sub1's files are contiguous, with its own files before its subdirectory
+    assert sub1 == ["tree/sub1/b.txt", "tree/sub1/deep/c.txt"]
+    assert files.index("tree/sub1/deep/c.txt") - files.index("tree/sub1/b.txt") == 1
+
+
+def test_list_files_uses_cached_git_listing(temp_codebase, mocker):
+    """Test that a git repo is listed via git ls-files and cached on the index."""
+    repo = temp_codebase / "repo"
+    repo.mkdir()
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(repo))
+    git_ops.clear_file_list_cache()
+
+    (repo / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (repo / "src").mkdir()
+    (repo / "src" / "main.py").write_text("print('hi')", encoding="utf-8")
+    (repo / "gone.txt").write_text("x", encoding="utf-8")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    (repo / "gone.txt").unlink()
+    (repo / "untracked.txt").write_text("x", encoding="utf-8")
+    (repo / "debug.log").write_text("x", encoding="utf-8")
+
+    check_output = mocker.spy(git_ops.subprocess, "check_output")
+    files = git_ops.list_files(".")
+
+    assert sorted(files) == [".gitignore", "src/main.py", "untracked.txt"]
+    assert git_ops.list_files("src") == ["src/main.py"]
+    # The second listing was served from the cache
+    assert check_output.call_count == 2
+    git_ops.clear_file_list_cache()
+
+
+def test_list_files_uses_git_listing_in_worktree(temp_codebase, mocker):
+    """Test that a linked worktree, where .git is a file, uses the git listing."""
+    main = temp_codebase / "main"
+    main.mkdir()
+    (main / "a.txt").write_text("x", encoding="utf-8")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q"], cwd=main, check=True)
+    subprocess.run(["git", "add", "."], cwd=main, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "c"], cwd=main, check=True)
+    worktree = temp_codebase / "wt"
+    subprocess.run(
+        ["git", "worktree", "add", "-q", "-b", "wt", str(worktree)],
+        cwd=main,
+        check=True,
+    )
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(worktree))
+    git_ops.clear_file_list_cache()
+
+    check_output = mocker.spy(git_ops.subprocess, "check_output")
+
+    assert git_ops.list_files(".") == ["a.txt"]
+    assert git_ops.list_files(".") == ["a.txt"]
+    assert check_output.call_count == 2
+    git_ops.clear_file_list_cache()
+
+
+def test_git_listing_refreshes_when_gitignore_changes(temp_codebase, mocker):
+    """Test that editing .gitignore invalidates the cached git listing."""
+    repo = temp_codebase / "repo"
+    repo.mkdir()
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(repo))
+    git_ops.clear_file_list_cache()
+
+    (repo / "a.txt").write_text("x", encoding="utf-8")
+    (repo / "b.tmp").write_text("x", encoding="utf-8")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+
+    assert sorted(git_ops.list_files(".")) == ["a.txt", "b.tmp"]
+
+    (repo / ".gitignore").write_text("*.tmp\n", encoding="utf-8")
+    assert sorted(git_ops.list_files(".")) == [".gitignore", "a.txt"]
+    git_ops.clear_file_list_cache()
+
+
+def test_git_listing_prunes_ignored_directories(temp_codebase, mocker):
+    """Test that files under an ignored directory are not matched one by one."""
+    repo = temp_codebase / "repo"
+    (repo / "build" / "out").mkdir(parents=True)
+    mocker.patch("app.services.git_ops.CODEBASE_ROOT", str(repo))
+    git_ops.clear_file_list_cache()
+
+    (repo / ".gitignore").write_text("build/\n", encoding="utf-8")
+    (repo / "main.py").write_text("x", encoding="utf-8")
+    for i in range(3):
+        (repo / "build" / "out" / f"{i}.bin").write_text("x", encoding="utf-8")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    # Force-add so git lists the ignored files and list_files must filter them
+    subprocess.run(["git", "add", "-f", "."], cwd=repo, check=True)
+
+    match_file = mocker.spy(git_ops.GitignoreMatcher, "match_file")
+    files = git_ops.list_files(".")
+
+    assert sorted(files) == [".gitignore", "main.py"]
+    matched = [call.args[1] for call in match_file.call_args_list]
+    # "build/" is a bare directory name, so it is pruned without any match_file call
+    assert [path for path in matched if path.startswith("build")] == []
+    git_ops.clear_file_list_cache()
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["node_modules/", "*.log", "/temp/", "secret.txt", "docs/**/*.md"],
+        [".git/", "venv/", ".env", "secret.txt\n", "  spaced"],
+        ["*.log", "!keep.log", "build/"],
+        ["/build", "docs/*.md", "src/**/gen/", "/temp/", "**/venv", "/*.txt"],
+        [],
+    ],
+)
+def test_gitignore_matcher_agrees_with_pathspec(patterns):
+    """Test that the combined-regex matcher gives the same answers as PathSpec."""
+    spec = git_ops.pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+    matcher = git_ops.GitignoreMatcher(spec)
+    paths = [
+        "node_modules/",
+        "src/node_modules/",
+        "a.log",
+        "src/keep.log",
+        "keep.log",
+        "temp/",
+        "src/temp/",
+        "secret.txt",
+        "docs/a/b.md",
+        "docs/b.txt",
+        "build/",
+        "main.py",
+        ".git/",
+        "a/.git/config",
+        "venv",
+        "venv/",
+        "a/venv/b.py",
+        ".env",
+        "a/.env/x",
+        "a/secret.txt/b",
+        "spaced",
+        "build",
+        "src/build/",
+        "docs/b.md",
+        "src/docs/b.md",
+        "src/a/gen/",
+        "src/gen/x.py",
+        "lib/src/gen/",
+        "temp/x",
+    ]
+
+    assert [matcher.match_file(p) for p in paths] == [spec.match_file(p) for p in paths]
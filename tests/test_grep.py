@@ -5,7 +5,7 @@ Tests for git_ops.grep_code.
 import os
 import shutil
 import tempfile
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 import pytest
 from app.services import git_ops
 
@@ -63,55 +63,74 @@ def test_grep_code_case_insensitive(temp_codebase):
 
 def test_grep_code_truncation(temp_codebase):
     """Test grep_code truncates output."""
-    assert os.path.isdir(temp_codebase)
+    with open(os.path.join(temp_codebase, "many.py"), "w", encoding="utf-8") as f:
+        f.writelines(f"target_function_{i} = {i}\n" for i in range(500))
 
-    long_output = "a" * 2005
+    result = git_ops.grep_code("target_function_")
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = MagicMock()
-        mock_result.stdout = long_output
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+    assert len(result) <= 2100
+    assert "... [Output truncated to 2000 chars]" in result
 
-        result = git_ops.grep_code("foo")
 
-        assert len(result) <= 2100
-        assert "... [Output truncated to 2000 chars]" in result
+def _mock_grep_process(mock_popen, stdout, returncode=0):
+    """Configures a patched Popen to behave like a finished grep."""
+    proc = mock_popen.return_value.__enter__.return_value
+    proc.stdout.read.return_value = stdout
+    proc.wait.return_value = returncode
+    return proc
 
 
 def test_grep_code_fallback_commands():
     """Test grep_code fallback to standard grep when not in a git repo."""
     # Mock os.path.exists to simulate no .git directory
     with patch("app.services.git_ops.os.path.exists", return_value=False), patch(
-        "app.services.git_ops.subprocess.run"
-    ) as mock_run:
+        "app.services.git_ops.subprocess.Popen"
+    ) as mock_popen:
 
-        # Configure mock_run result
-        mock_result = MagicMock()
-        mock_result.stdout = "matches"
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+        # Configure mock process result
+        _mock_grep_process(mock_popen, "matches")
 
         # Test 1: Default (Case Insensitive)
         git_ops.grep_code("test_query")
 
         # Verify call arguments for default (case insensitive) fallback
-        mock_run.assert_called_with(
-            ["grep", "-r", "-n", "-i", "-e", "test_query", "."],
-            cwd=git_ops.CODEBASE_ROOT,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        assert mock_popen.call_args.args[0] == [
+            "grep",
+            "-r",
+            "-n",
+            "-m",
+            "2000",
+            "-i",
+            "-e",
+            "test_query",
+            ".",
+        ]
+        assert mock_popen.call_args.kwargs["cwd"] == git_ops.CODEBASE_ROOT
 
         # Test 2: Case Sensitive
         git_ops.grep_code("test_query", case_sensitive=True)
 
         # Verify call arguments for case sensitive fallback
-        mock_run.assert_called_with(
-            ["grep", "-r", "-n", "-e", "test_query", "."],
-            cwd=git_ops.CODEBASE_ROOT,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        assert mock_popen.call_args.args[0] == [
+            "grep",
+            "-r",
+            "-n",
+            "-m",
+            "2000",
+            "-e",
+            "test_query",
+            ".",
+        ]
+
+
+def test_grep_code_stops_reading_at_limit():
+    """Test that grep is killed once the output limit is exceeded."""
+    with patch("app.services.git_ops.subprocess.Popen") as mock_popen:
+        proc = _mock_grep_process(mock_popen, "a" * 2001)
+
+        result = git_ops.grep_code("foo")
+
+        proc.stdout.read.assert_called_once_with(2001)
+        proc.kill.assert_called_once()
+        proc.wait.assert_not_called()
+        assert result == "a" * 2000 + "\n... [Output truncated to 2000 chars]"
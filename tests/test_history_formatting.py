@@ -76,6 +76,45 @@ class TestHistoryFormat(unittest.TestCase):
             # Fallback for older pydantic or different structure
             self.fail(f"Could not inspect part: {part}")
 
+    def test_inline_data_decoded_once(self):
+        """Test that stored attachments decode to bytes and are reused across turns."""
+        image = {"inline_data": {"mime_type": "image/png", "data": "aGVsbG8="}}
+        history = [
+            {"role": "user", "parts": [{"text": "look"}, image]},
+            {"role": "model", "parts": [{"text": "ok"}]},
+            {"role": "user", "parts": [{"text": "current message"}]},
+        ]
+        llm_service._inline_data_part.cache_clear()
+
+        first = llm_service.format_history(history)
+        second = llm_service.format_history(history)
+
+        blob = first[0]["parts"][1].inline_data
+        self.assertEqual(blob.mime_type, "image/png")
+        self.assertEqual(blob.data, b"hello")
+        self.assertIs(second[0]["parts"][1], first[0]["parts"][1])
+        self.assertEqual(llm_service._inline_data_part.cache_info().misses, 1)
+
+    def test_stored_messages_formatted_once(self):
+        """Test that messages with a database id are only converted on first use."""
+        history = [
+            {"id": "m1", "role": "user", "parts": [{"text": "hi"}]},
+            {"id": "m2", "role": "function", "parts": [{"text": "legacy"}]},
+            {"id": "m3", "role": "user", "parts": [{"text": "current message"}]},
+        ]
+        llm_service._FORMATTED_MESSAGES.clear()
+
+        first = llm_service.format_history(history)
+        second = llm_service.format_history(history, include_last=True)
+
+        self.assertEqual(set(llm_service._FORMATTED_MESSAGES), {"m1", "m2", "m3"})
+        self.assertEqual(second[1]["role"], "user")
+        self.assertIs(second[0]["parts"][0], first[0]["parts"][0])
+        # Callers get their own lists
+        second[0]["parts"].append("extra")
+        self.assertEqual(len(first[0]["parts"]), 1)
+        llm_service._FORMATTED_MESSAGES.clear()
+
 
 if __name__ == "__main__":
     unittest.main()
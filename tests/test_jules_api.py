@@ -14,6 +14,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app.services import jules_api  # pylint: disable=wrong-import-position
 
 
+@pytest.fixture(autouse=True)
+def reset_session():
+    """Drop the shared session and API key so each test sets up (and mocks) its own."""
+    # pylint: disable=protected-access
+    jules_api._SESSION.update(session=None, loop=None)
+    jules_api._get_api_key.cache_clear()
+    yield
+    jules_api._SESSION.update(session=None, loop=None)
+    jules_api._get_api_key.cache_clear()
+
+
 @pytest.mark.asyncio
 async def test_deploy_to_jules_success():
     """Test successful deployment."""
@@ -24,25 +35,23 @@ async def test_deploy_to_jules_success():
     mock_response.status = 200
     mock_response.json.return_value = {"success": True}
 
-    # Mock the context manager returned by client.post
+    # Mock the context manager returned by client.request
     mock_post_ctx = AsyncMock()
     mock_post_ctx.__aenter__.return_value = mock_response
 
     mock_client = MagicMock()
-    mock_client.post.return_value = mock_post_ctx
+    mock_client.request.return_value = mock_post_ctx
 
     with patch.dict(os.environ, {"JULES_API_KEY": "test-key"}):
-        with patch(
-            "aiohttp.ClientSession", return_value=MagicMock()
-        ) as mock_client_cls:
-            mock_client_cls.return_value.__aenter__.return_value = mock_client
+        with patch("aiohttp.ClientSession", return_value=mock_client):
 
             result = await jules_api.deploy_to_jules(prompt, repo_info)
 
             assert result == {"success": True}
 
-            mock_client.post.assert_called_once()
-            _, kwargs = mock_client.post.call_args
+            mock_client.request.assert_called_once()
+            args, kwargs = mock_client.request.call_args
+            assert args == ("POST", "https://jules.googleapis.com/v1alpha/sessions")
             assert kwargs["json"]["prompt"] == prompt
             assert kwargs["json"]["sourceContext"]["source"] == "src-123"
             assert (
@@ -80,13 +89,10 @@ async def test_deploy_to_jules_api_error():
     mock_post_ctx.__aenter__.return_value = mock_response
 
     mock_client = MagicMock()
-    mock_client.post.return_value = mock_post_ctx
+    mock_client.request.return_value = mock_post_ctx
 
     with patch.dict(os.environ, {"JULES_API_KEY": "test-key"}):
-        with patch(
-            "aiohttp.ClientSession", return_value=MagicMock()
-        ) as mock_client_cls:
-            mock_client_cls.return_value.__aenter__.return_value = mock_client
+        with patch("aiohttp.ClientSession", return_value=mock_client):
 
             with pytest.raises(RuntimeError, match="Jules API Error: 500"):
                 await jules_api.deploy_to_jules("prompt", {"source_id": "123"})
@@ -96,13 +102,10 @@ async def test_deploy_to_jules_api_error():
 async def test_deploy_to_jules_request_exception():
     """Test request exception."""
     mock_client = MagicMock()
-    mock_client.post.side_effect = aiohttp.ClientError("Connection failed")
+    mock_client.request.side_effect = aiohttp.ClientError("Connection failed")
 
     with patch.dict(os.environ, {"JULES_API_KEY": "test-key"}):
-        with patch(
-            "aiohttp.ClientSession", return_value=MagicMock()
-        ) as mock_client_cls:
-            mock_client_cls.return_value.__aenter__.return_value = mock_client
+        with patch("aiohttp.ClientSession", return_value=mock_client):
 
             with pytest.raises(aiohttp.ClientError):
                 await jules_api.deploy_to_jules("prompt", {"source_id": "123"})
@@ -121,15 +124,62 @@ async def test_get_session_status_success():
     mock_get_ctx.__aenter__.return_value = mock_response
 
     mock_client = MagicMock()
-    mock_client.get.return_value = mock_get_ctx
+    mock_client.request.return_value = mock_get_ctx
 
     with patch.dict(os.environ, {"JULES_API_KEY": "test-key"}):
-        with patch(
-            "aiohttp.ClientSession", return_value=MagicMock()
-        ) as mock_client_cls:
-            mock_client_cls.return_value.__aenter__.return_value = mock_client
+        with patch("aiohttp.ClientSession", return_value=mock_client):
 
             result = await jules_api.get_session_status(session_name)
             assert result == {"state": "SUCCEEDED"}
 
-            mock_client.get.assert_called_once()
+            mock_client.request.assert_called_once()
+            args, kwargs = mock_client.request.call_args
+            assert args == ("GET", "https://jules.googleapis.com/v1alpha/sessions/123")
+            assert kwargs["headers"]["X-Goog-Api-Key"] == "test-key"
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_and_closed():
+    """Test that calls share one client session until it is closed."""
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.json.return_value = {"state": "SUCCEEDED"}
+    mock_get_ctx = AsyncMock()
+    mock_get_ctx.__aenter__.return_value = mock_response
+
+    mock_client = MagicMock(closed=False)
+    mock_client.request.return_value = mock_get_ctx
+    mock_client.close = AsyncMock()
+
+    with patch.dict(os.environ, {"JULES_API_KEY": "test-key"}):
+        with patch("aiohttp.ClientSession", return_value=mock_client) as mock_cls:
+            await jules_api.get_session_status("sessions/1")
+            await jules_api.get_session_status("sessions/2")
+            assert mock_cls.call_count == 1
+
+            await jules_api.close_jules_session()
+            mock_client.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_session_from_other_loop_is_closed():
+    """Test that a session left over from another event loop is closed, not leaked."""
+    # pylint: disable=protected-access
+    stale = MagicMock(closed=False)
+    stale.close = AsyncMock()
+    jules_api._SESSION.update(session=stale, loop=object())
+
+    with patch("aiohttp.ClientSession") as mock_cls:
+        session = await jules_api._get_session()
+
+    stale.close.assert_awaited_once()
+    assert session is mock_cls.return_value
+
+
+def test_api_key_resolved_once():
+    """Test that the API key falls back to GOOGLE_API_KEY and is cached."""
+    # pylint: disable=protected-access
+    with patch.dict(os.environ, {"GOOGLE_API_KEY": "google-key"}, clear=True):
+        assert jules_api._get_api_key() == "google-key"
+    with patch.dict(os.environ, {"JULES_API_KEY": "jules-key"}, clear=True):
+        assert jules_api._get_api_key() == "google-key"
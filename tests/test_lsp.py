@@ -39,6 +39,9 @@ def test_registry_loading(mock_registry):
     config = mock_registry.get_config_by_extension(".py")
     assert config is not None
     assert config["bin"] == "pylsp"
+    assert mock_registry.get_language_by_extension(".test") == "testlang"
+    assert mock_registry.get_config_by_extension(".unknown") is None
+    assert mock_registry.get_language_by_extension(".unknown") is None
 
 
 def test_registry_missing_binary():
@@ -162,3 +165,191 @@ async def test_git_ops_get_definition(mock_read_file, mock_lsp_manager_cls):
     assert result["file"] == "test.py"
     assert result["line"] == 11  # 10 + 1
     assert result["content"] == "def my_func():\n    pass"
+
+
+def test_send_payload_frames_utf8_bytes():
+    """Test that Content-Length counts the encoded body bytes."""
+    # pylint: disable=import-outside-toplevel, protected-access
+    import socket
+    from app.services.lsp_manager import LSPServer
+
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "testlang", "/", sock=ours)
+    try:
+        params = {"text": "def åäö(): pass"}
+        assert server._send_payload({"jsonrpc": "2.0", "method": "m", "params": params})
+
+        data = theirs.recv(65536)
+        header, body = data.split(b"\r\n\r\n", 1)
+        assert header == b"Content-Length: %d" % len(body)
+        assert json.loads(body)["params"] == params
+    finally:
+        server.terminate()
+        theirs.close()
+
+
+def test_send_request_roundtrip_and_timeout():
+    """Test that a response wakes its request and unanswered requests time out."""
+    # pylint: disable=import-outside-toplevel, protected-access
+    import socket
+    import threading
+    from app.services.lsp_manager import LSPServer
+
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "testlang", "/", sock=ours)
+
+    def answer_first_request():
+        header, body = theirs.recv(65536).split(b"\r\n\r\n", 1)
+        assert header.startswith(b"Content-Length: ")
+        reply = json.dumps(
+            {"jsonrpc": "2.0", "id": json.loads(body)["id"], "result": "ok"}
+        ).encode("utf-8")
+        theirs.sendall(b"Content-Length: %d\r\n\r\n" % len(reply) + reply)
+
+    responder = threading.Thread(target=answer_first_request)
+    responder.start()
+    try:
+        response = server.send_request("ping", {}, timeout=5)
+        responder.join()
+        assert response["result"] == "ok"
+
+        assert server.send_request("silent", {}, timeout=0.05) is None
+        assert not server.pending
+        assert not server.responses
+    finally:
+        server.terminate()
+        theirs.close()
+
+
+def _read_lsp_message(infile) -> dict:
+    """Reads one Content-Length framed JSON-RPC message."""
+    length = int(infile.readline().split(b":")[1])
+    infile.readline()  # blank line ending the headers
+    return json.loads(infile.read(length))
+
+
+def test_request_ids_are_sequential():
+    """Test that request ids come from a per-server counter."""
+    # pylint: disable=import-outside-toplevel
+    import socket
+    from app.services.lsp_manager import LSPServer
+
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "testlang", "/", sock=ours)
+    infile = theirs.makefile("rb")
+    try:
+        server.send_request("a", {}, timeout=0)
+        server.send_request("b", {}, timeout=0)
+
+        assert _read_lsp_message(infile)["id"] == 1
+        assert _read_lsp_message(infile)["id"] == 2
+    finally:
+        server.terminate()
+        infile.close()
+        theirs.close()
+
+
+def test_sync_document_opens_once_and_sends_changes(tmp_path):
+    """Test that a file is opened once and resent only after it changes."""
+    # pylint: disable=import-outside-toplevel
+    import os
+    import socket
+    from app.services.lsp_manager import LSPServer
+
+    source = tmp_path / "mod.py"
+    source.write_text("x = 1\n", encoding="utf-8")
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "python", str(tmp_path), sock=ours)
+    infile = theirs.makefile("rb")
+    try:
+        uri = server.sync_document(str(source), "python")
+        assert uri == f"file://{source}"
+        # The deferred didOpen goes out with the next message, in order
+        server.send_notification("initialized", {})
+        opened = _read_lsp_message(infile)
+        assert opened["method"] == "textDocument/didOpen"
+        assert opened["params"]["textDocument"]["text"] == "x = 1\n"
+        assert _read_lsp_message(infile)["method"] == "initialized"
+
+        # Unchanged: nothing is sent
+        server.sync_document(str(source), "python")
+        source.write_text("x = 22\n", encoding="utf-8")
+        os.utime(source, ns=(1, 1))
+        server.sync_document(str(source), "python")
+        server.send_notification("flush", {})
+
+        changed = _read_lsp_message(infile)
+        assert changed["method"] == "textDocument/didChange"
+        assert changed["params"]["textDocument"]["version"] == 2
+        assert changed["params"]["contentChanges"] == [{"text": "x = 22\n"}]
+        assert _read_lsp_message(infile)["method"] == "flush"
+    finally:
+        server.terminate()
+        infile.close()
+        theirs.close()
+
+
+def test_find_root_cached_per_directory(tmp_path):
+    """Test that project roots are found by marker and cached per directory."""
+    # pylint: disable=import-outside-toplevel, protected-access
+    from app.services import lsp_manager
+
+    (tmp_path / "proj" / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "proj" / "pyproject.toml").write_text("", encoding="utf-8")
+    source = str(tmp_path / "proj" / "src" / "pkg" / "mod.py")
+    lsp_manager._find_root_from.cache_clear()
+    manager = LSPManager()
+
+    root = manager._find_root(source, ["pyproject.toml"])
+    assert root == str(tmp_path / "proj")
+    assert manager._find_root(source, ["pyproject.toml"]) == root
+    assert lsp_manager._find_root_from.cache_info().hits == 1
+
+
+def test_read_loop_parses_headers_case_insensitively():
+    """Test that responses framed with extra headers are still delivered."""
+    # pylint: disable=import-outside-toplevel
+    import socket
+    import threading
+    from app.services.lsp_manager import LSPServer
+
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "testlang", "/", sock=ours)
+    infile = theirs.makefile("rb")
+
+    def answer():
+        request = _read_lsp_message(infile)
+        reply = json.dumps({"id": request["id"], "result": "é"}).encode("utf-8")
+        theirs.sendall(
+            b"content-length: %d\r\n"
+            b"Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n\r\n"
+            % len(reply)
+            + reply
+        )
+
+    responder = threading.Thread(target=answer)
+    responder.start()
+    try:
+        assert server.send_request("ping", {}, timeout=5)["result"] == "é"
+        responder.join()
+    finally:
+        server.terminate()
+        infile.close()
+        theirs.close()
+
+
+def test_lsp_server_has_no_instance_dict():
+    """Test that LSPServer instances use slots for all their attributes."""
+    # pylint: disable=import-outside-toplevel
+    import socket
+    from app.services.lsp_manager import LSPServer
+
+    ours, theirs = socket.socketpair()
+    server = LSPServer(None, "testlang", "/", sock=ours)
+    try:
+        assert not hasattr(server, "__dict__")
+        server.status = "running"
+        assert server.status == "running"
+    finally:
+        server.terminate()
+        theirs.close()
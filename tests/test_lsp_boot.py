@@ -3,6 +3,7 @@ Test for LSP boot logic.
 """
 
 import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -75,6 +76,34 @@ class TestLSPBoot(unittest.IsolatedAsyncioTestCase):
         # Ensure we only called start_server once
         self.assertEqual(mock_start_server.call_count, 1)
 
+    @patch("app.services.lsp_manager.LSPRegistry")
+    def test_language_scan_prunes_and_matches_extensions(self, mock_registry_cls):
+        """Tests that ignored directories are skipped and any listed extension counts."""
+        # pylint: disable=protected-access
+        mock_registry_cls.return_value._config = {
+            "typescript": {"extensions": [".ts", ".tsx"]},
+            "kotlin": {"extensions": [".kt", ".kts"]},
+            "python": {"extensions": [".py"]},
+        }
+        with tempfile.TemporaryDirectory() as root:
+            for rel in [
+                "a.ts",
+                "src/b.tsx",
+                "build.gradle.kts",
+                "node_modules/x.py",
+                "node_modules/y.py",
+                "Main.kt",
+                ".py",
+            ]:
+                path = os.path.join(root, rel)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("")
+
+            found = LSPManager()._get_supported_languages_in_path(root)
+
+        self.assertCountEqual(found, ["typescript", "kotlin"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,10 +3,16 @@ Tests for prompt_router service.
 """
 
 import json
+import os
 from unittest.mock import patch, mock_open, MagicMock
 from datetime import datetime
+
+import pytest
+
 from app.services.prompt_router import (
     load_active_persona,
+    save_active_persona,
+    CHAT_OUTPUT_CONTRACT,
     PERSONA_FILE,
     load_core_instruction,
     get_system_instruction,
@@ -15,9 +21,18 @@ from app.services.prompt_router import (
     load_cli_core_instruction,
     PERSONA_PROMPTS,
     SPECIALIST_PERSONAS,
+    _classify_with_model,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_classification_cache():
+    """Keeps cached model classifications from leaking between tests."""
+    _classify_with_model.cache_clear()
+    yield
+    _classify_with_model.cache_clear()
+
+
 def test_load_active_persona_file_not_found():
     """Test that load_active_persona returns None when the file does not exist."""
     load_active_persona.cache_clear()
@@ -260,3 +275,122 @@ def test_get_system_instruction_for_cli():
                 assert "MOCK_CLI_CORE_INSTRUCTION" in instruction
                 assert "MOCK_EXTRA_INSTRUCTION" in instruction
                 assert "Today's date is 2023-10-27" in instruction
+
+
+def test_get_system_instruction_reuses_composed_string():
+    """Test that repeated turns return the same instruction string object."""
+    with patch("app.services.prompt_router.classify_specialist", return_value=None):
+        first = get_system_instruction("CHAT", "hello")
+        second = get_system_instruction("CHAT", "again")
+
+    assert first is second
+    assert first.endswith(CHAT_OUTPUT_CONTRACT)
+
+
+def test_classify_specialist_keywords_skip_model():
+    """Test that a query matching one specialist's keywords is classified locally."""
+    with patch("app.services.prompt_router.CLIENT") as mock_client:
+        assert classify_specialist("Why does the Dockerfile build fail?") == "CI_CD"
+        assert classify_specialist("Add a permission to AndroidManifest.xml") == (
+            "MOBILE"
+        )
+        assert classify_specialist("Update AGENTS.md for the new module") == (
+            "ARCHITECT"
+        )
+        mock_client.models.generate_content.assert_not_called()
+
+        # Keywords from two specialists are ambiguous, so the model decides
+        mock_response = MagicMock()
+        mock_response.parsed = Intent(persona="UI", task_type="feature")
+        mock_client.models.generate_content.return_value = mock_response
+        assert (
+            classify_specialist("Build the Jetpack Compose app in GitHub Actions")
+            == "UI"
+        )
+        mock_client.models.generate_content.assert_called_once()
+
+
+def test_classify_specialist_generic_words_go_to_model():
+    """Test that generic words don't bypass the model and its NONE answer."""
+    queries = [
+        "How does dependency injection work in FastAPI?",
+        "Explain the workflow of the order processing function",
+        "Refactor the data pipeline",
+        "What is the lifecycle of a request in FastAPI?",
+        "Add icons to the web app manifest.json",
+        "Which CPU architecture does this binary target?",
+        "Set up CI for the project",
+        "Use a material color for the chart",
+    ]
+    with patch("app.services.prompt_router.CLIENT") as mock_client:
+        mock_client.models.generate_content.return_value = MagicMock(
+            parsed=Intent(persona="NONE", task_type="question")
+        )
+        for query in queries:
+            assert classify_specialist(query) is None, query
+
+    assert mock_client.models.generate_content.call_count == len(queries)
+
+
+def test_specialist_keywords_are_known_specialists():
+    """Test that every keyword group maps to a real specialist module."""
+    # pylint: disable=import-outside-toplevel, protected-access
+    from app.services import prompt_router
+
+    assert set(prompt_router._SPECIALIST_KEYWORDS) <= SPECIALIST_PERSONAS
+
+
+def test_classify_specialist_uses_minimal_thinking():
+    """Test that the classifier request asks for minimal thinking."""
+    with patch("app.services.prompt_router.CLIENT") as mock_client:
+        mock_client.models.generate_content.return_value = MagicMock(parsed=None)
+        classify_specialist("Unknown request")
+
+    config = mock_client.models.generate_content.call_args.kwargs["config"]
+    assert config.thinking_config.thinking_level == "MINIMAL"
+
+
+def test_classify_specialist_caches_model_answers():
+    """Test that a re-asked query is answered without a second model call."""
+    with patch("app.services.prompt_router.CLIENT") as mock_client:
+        mock_client.models.generate_content.return_value = MagicMock(
+            parsed=Intent(persona="DEBUG", task_type="bug")
+        )
+        assert classify_specialist("Why is this slow?") == "DEBUG"
+        assert classify_specialist("  why is  this slow? ") == "DEBUG"
+        mock_client.models.generate_content.assert_called_once()
+
+        # Errors are not cached
+        mock_client.models.generate_content.side_effect = Exception("API Error")
+        assert classify_specialist("Something new") is None
+        mock_client.models.generate_content.side_effect = None
+        assert classify_specialist("Something new") == "DEBUG"
+
+
+def test_save_active_persona_replaces_file(tmp_path):
+    """Test that saving swaps in a complete file and leaves no temp file behind."""
+    # pylint: disable=import-outside-toplevel
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    state_dir = tmp_path / "state"
+    persona_file = str(state_dir / "persona_state.json")
+    with patch("app.services.prompt_router.PERSONA_FILE", persona_file):
+        load_active_persona.cache_clear()
+        save_active_persona("CODE")
+        assert load_active_persona() == "CODE"
+
+        # The directory is recreated if it goes away
+        shutil.rmtree(state_dir)
+        save_active_persona("CHAT")
+        assert load_active_persona() == "CHAT"
+
+        # Overlapping saves each use their own temp file
+        with patch("app.services.prompt_router.logger") as mock_logger:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(save_active_persona, ["CODE", "CHAT"] * 20))
+            mock_logger.error.assert_not_called()
+        assert load_active_persona() in ("CODE", "CHAT")
+
+    assert os.listdir(state_dir) == ["persona_state.json"]
+    load_active_persona.cache_clear()
@@ -227,3 +227,51 @@ def test_index_codebase_batching(mock_chroma, mock_genai):
                     manager.genai_client.models.embed_content.assert_called_once()
                     call_args = manager.genai_client.models.embed_content.call_args
                     assert call_args.kwargs["contents"] == ["content1", "content2"]
+
+
+def test_index_codebase_embeds_batches_concurrently(mock_chroma, mock_genai):
+    """Test that embedding batches overlap while upserts keep batch order."""
+    # pylint: disable=import-outside-toplevel
+    import threading
+
+    with patch.dict(os.environ, {"GOOGLE_API_KEY": "test_key"}):
+        manager = RAGManager()
+        manager.collection = MagicMock()
+        manager.collection.get.return_value = {"metadatas": [], "ids": []}
+
+        # Both batches must be in flight together for either to finish
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_embeddings(texts, task_type="RETRIEVAL_DOCUMENT"):
+            del task_type
+            barrier.wait()
+            return [[float(len(t))] for t in texts]
+
+        manager._get_embeddings = fake_embeddings  # pylint: disable=protected-access
+        docs = [f"doc{i}" for i in range(150)]
+
+        def fake_process(_filepath, pending_data, _existing_info=None):
+            for i, doc in enumerate(docs):
+                pending_data["documents"].append(doc)
+                pending_data["ids"].append(f"id{i}")
+                pending_data["metadatas"].append({})
+            return True
+
+        manager._process_file_indexing = (  # pylint: disable=protected-access
+            fake_process
+        )
+        with patch("os.walk") as mock_walk, patch(
+            "app.services.rag_manager.load_gitignore_spec"
+        ) as mock_spec:
+            from app.services.rag_manager import CODEBASE_ROOT
+
+            mock_walk.return_value = [(CODEBASE_ROOT, [], ["test.py"])]
+            mock_spec.return_value.match_file.return_value = False
+            mock_spec.return_value.ignored_dir_names = set()
+
+            result = manager.index_codebase()
+
+        assert result["files_indexed"] == 1
+        calls = manager.collection.upsert.call_args_list
+        assert [c.kwargs["ids"][0] for c in calls] == ["id0", "id100"]
+        assert calls[1].kwargs["documents"] == docs[100:]
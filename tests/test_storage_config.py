@@ -1,4 +1,5 @@
 import os
+import stat
 import unittest
 from unittest.mock import patch, MagicMock
 import importlib
@@ -23,29 +24,23 @@ class TestStorageConfig(unittest.TestCase):
             self.assertEqual(path, "/custom/path.json")
 
     def test_get_storage_path_priority_2_config_dir(self):
-        # We need to ensure os.path.exists returns True for /config only
-        original_exists = os.path.exists
-        original_isdir = os.path.isdir
+        # We need to ensure /config stats as a directory and is writable
+        original_stat = os.stat
         original_access = os.access
 
-        def side_effect_exists(path):
+        def side_effect_stat(path, *args, **kwargs):
             if path == "/config":
-                return True
-            return original_exists(path)
-
-        def side_effect_isdir(path):
-            if path == "/config":
-                return True
-            return original_isdir(path)
+                return os.stat_result((stat.S_IFDIR | 0o755,) + (0,) * 9)
+            return original_stat(path, *args, **kwargs)
 
         def side_effect_access(path, mode):
             if path == "/config" and mode == os.W_OK:
                 return True
             return original_access(path, mode)
 
-        with patch("os.path.exists", side_effect=side_effect_exists), patch(
-            "os.path.isdir", side_effect=side_effect_isdir
-        ), patch("os.access", side_effect=side_effect_access):
+        with patch("os.stat", side_effect=side_effect_stat), patch(
+            "os.access", side_effect=side_effect_access
+        ):
             from app.services import storage
 
             importlib.reload(storage)
@@ -54,14 +49,14 @@ class TestStorageConfig(unittest.TestCase):
 
     def test_get_storage_path_fallback(self):
         # Ensure /config does not appear to exist
-        original_exists = os.path.exists
+        original_stat = os.stat
 
-        def side_effect_exists(path):
+        def side_effect_stat(path, *args, **kwargs):
             if path == "/config":
-                return False
-            return original_exists(path)
+                raise FileNotFoundError(path)
+            return original_stat(path, *args, **kwargs)
 
-        with patch("os.path.exists", side_effect=side_effect_exists):
+        with patch("os.stat", side_effect=side_effect_stat):
             from app.services import storage
 
             importlib.reload(storage)
@@ -0,0 +1,53 @@
+"""
+Tests for get_tool_config.
+"""
+
+# pylint: disable=protected-access
+
+from unittest.mock import MagicMock
+
+from app.services import llm_service
+
+
+def test_tool_declarations_built_once_per_client():
+    """Test that tool declarations are reused across get_tool_config calls."""
+    client = MagicMock()
+    client.vertexai = False
+    llm_service._function_declaration.cache_clear()
+
+    first = llm_service.get_tool_config(client, enable_search=False)
+    misses = llm_service._function_declaration.cache_info().misses
+    second = llm_service.get_tool_config(client, enable_search=False)
+
+    names = [d.name for d in first.function_declarations]
+    assert "read_file" in names
+    assert [d.name for d in second.function_declarations] == names
+    assert llm_service._function_declaration.cache_info().misses == misses
+
+
+def test_write_tools_follow_write_access(mocker):
+    """Test that write_to_docs is only declared when write access is enabled."""
+    mocker.patch("app.config.WRITE_ACCESS_ENABLED", True)
+    client = MagicMock()
+    client.vertexai = False
+
+    read_only = llm_service.get_tool_config(client, enable_search=False)
+    writable = llm_service.get_tool_config(
+        client, enable_search=False, write_access_enabled=True
+    )
+
+    assert "write_to_docs" not in [d.name for d in read_only.function_declarations]
+    assert "write_to_docs" in [d.name for d in writable.function_declarations]
+
+
+def test_list_files_limit_declared_nullable():
+    """Test that the model is told list_files accepts a null limit."""
+    client = MagicMock()
+    client.vertexai = False
+
+    config = llm_service.get_tool_config(client, enable_search=False)
+
+    declaration = next(
+        d for d in config.function_declarations if d.name == "list_files"
+    )
+    assert declaration.parameters.properties["limit"].nullable
@@ -0,0 +1,64 @@
+"""
+Tests for the web fetching service.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from app.services import web_ops
+
+
+def _mock_response(content_type: str, body: bytes = b"") -> MagicMock:
+    response = MagicMock()
+    response.headers = {"Content-Type": content_type}
+    response.iter_content.return_value = [body]
+    return response
+
+
+def test_fetch_url_reuses_session():
+    """Test that fetches go through the shared pooled session."""
+    html = b"<html><body><p>Hello</p></body></html>"
+    with patch.object(
+        web_ops._SESSION,  # pylint: disable=protected-access
+        "get",
+        return_value=_mock_response("text/html; charset=utf-8", html),
+    ) as mock_get:
+        assert web_ops.fetch_url("https://example.com/a") == "Hello"
+        assert web_ops.fetch_url("https://example.com/b") == "Hello"
+
+    assert mock_get.call_count == 2
+    mock_get.assert_called_with("https://example.com/b", timeout=10, stream=True)
+
+
+def test_fetch_url_rejects_downloads():
+    """Test that non-text content types are refused."""
+    with patch.object(
+        web_ops._SESSION,  # pylint: disable=protected-access
+        "get",
+        return_value=_mock_response("application/zip"),
+    ):
+        result = web_ops.fetch_url("https://example.com/file.zip")
+
+    assert result.startswith("Error: Downloading files is strictly forbidden.")
+
+
+def test_session_only_retries_gateway_statuses():
+    """Test that connect/read failures are not retried, only 502/503/504."""
+    retry = web_ops._ADAPTER.max_retries  # pylint: disable=protected-access
+
+    assert retry.connect == 0
+    assert retry.read == 0
+    assert set(retry.status_forcelist) == {502, 503, 504}
+
+
+def test_fetch_url_drops_cookies_between_fetches():
+    """Test that cookies set by one site are not sent to the next."""
+    session = web_ops._SESSION  # pylint: disable=protected-access
+
+    def set_cookie(*_args, **_kwargs):
+        session.cookies.set("sid", "secret", domain="example.com")
+        return _mock_response("text/plain", b"ok")
+
+    with patch.object(session, "get", side_effect=set_cookie):
+        assert web_ops.fetch_url("https://example.com") == "ok"
+
+    assert not session.cookies